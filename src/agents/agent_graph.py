@@ -25,6 +25,18 @@ class GraphManager:
         if self.adapter:
             self.adapter.store_file_node(file_path, repo_name, language, loc)
 
+    def store_file_nodes(self, files: List[Dict[str, Any]], repo_name: str):
+        """Create or update many File nodes (dicts with file_path, language, loc)"""
+        if not self.adapter:
+            return
+        if hasattr(self.adapter, "store_file_nodes"):
+            self.adapter.store_file_nodes(files, repo_name)
+        else:
+            for file in files:
+                self.adapter.store_file_node(
+                    file["file_path"], repo_name, file["language"], file["loc"]
+                )
+
     def store_code_structure(
         self, file_path: str, repo_name: str, structure: Dict[str, Any]
     ):
@@ -70,6 +82,17 @@ class GraphManager:
             return self.adapter.find_relationships(from_node, to_node, rel_type)
         return []
 
+    def update_degrees(self, repo_name: str):
+        """Refresh stored node degrees after ingestion (no-op where not needed)"""
+        if self.adapter and hasattr(self.adapter, "update_degrees"):
+            self.adapter.update_degrees(repo_name)
+
+    def get_hubs(self, repo_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """Most connected nodes of a repository: file, symbol, type, degree."""
+        if self.adapter and hasattr(self.adapter, "get_hubs"):
+            return self.adapter.get_hubs(repo_name, limit)
+        return []
+
     def store_build_target(
         self,
         name: str,
@@ -114,3 +137,46 @@ class GraphManager:
             # Save
             if hasattr(self.adapter, "save"):
                 self.adapter.save()
+
+    def store_build_targets(self, targets: List[Dict[str, Any]], repo_name: str):
+        """
+        Store many Build Targets at once: dicts with the store_build_target
+        arguments (name, build_type, cmd, dependent_files). Adapters with
+        batch writes get one node batch, one relationship batch and one save.
+        """
+        if not self.adapter or not targets:
+            return
+        if not (
+            hasattr(self.adapter, "add_nodes")
+            and hasattr(self.adapter, "add_relationships")
+        ):
+            for target in targets:
+                self.store_build_target(repo_name=repo_name, **target)
+            return
+
+        nodes = []
+        edges = []
+        for target in targets:
+            target_id = f"{repo_name}:build:{target['name']}"
+            nodes.append(
+                (
+                    target_id,
+                    ["BuildTarget"],
+                    {
+                        "name": target["name"],
+                        "build_type": target["build_type"],
+                        "command": target["cmd"],
+                        "repo_name": repo_name,
+                    },
+                )
+            )
+            # Target -> DEPENDS_ON -> File, as in store_build_target
+            edges.extend(
+                (target_id, f"{repo_name}:{file_path}", {"type": "DEPENDS_ON"})
+                for file_path in target["dependent_files"]
+            )
+
+        self.adapter.add_nodes(nodes)
+        self.adapter.add_relationships(edges)
+        if hasattr(self.adapter, "save"):
+            self.adapter.save()
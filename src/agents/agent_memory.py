@@ -135,6 +135,49 @@ class MemoryManager:
             logger.error(f"Failed to add memory: {e}")
             return ""
 
+    def add_memories(
+        self,
+        items: List[Dict[str, Any]],
+        memory_type: MemoryType,
+    ) -> List[str]:
+        """
+        Add many memory entries with one embedding call and one store call.
+
+        Args:
+            items: Dicts with 'content' and optional 'metadata'
+            memory_type: Type shared by all entries
+        """
+        if not items:
+            return []
+        try:
+            embeddings = self.embeddings.embed_documents(
+                [item["content"] for item in items]
+            )
+            timestamp = datetime.now().isoformat()
+
+            points = []
+            for item, embedding in zip(items, embeddings):
+                points.append(
+                    {
+                        "id": str(uuid.uuid4()),
+                        "embedding": embedding,
+                        "content": item["content"],
+                        "memory_type": memory_type.value,
+                        "timestamp": timestamp,
+                        **(item.get("metadata") or {}),
+                    }
+                )
+
+            self.vector_store.store_embeddings(points)
+
+            logger.info(f"Added {len(points)} {memory_type.value} memories")
+            self._enforce_memory_limits()
+            return [point["id"] for point in points]
+
+        except Exception as e:
+            logger.error(f"Failed to add memories: {e}")
+            return []
+
     def add_code_memory(
         self,
         file_path: str,
@@ -39,6 +39,12 @@ class CodeQualityAgent:
         self.neo4j = neo4j_adapter
         self.agent = agent_base
 
+        # One analyzer per agent, so its analysis cache and one-time index
+        # check carry over between analyze_repository calls
+        from tools.metrics import MetricsAnalyzer
+
+        self.metrics_analyzer = MetricsAnalyzer(neo4j_adapter)
+
         # State storage
         self.state_dir = Path.home() / ".yaver" / "projects" / project_id / "agent"
         self.state_dir.mkdir(parents=True, exist_ok=True)
@@ -84,10 +90,7 @@ class CodeQualityAgent:
 
         # Step 2: ANALYZE
         logger.info("[Agent] ANALYZE: Gathering metrics")
-        from tools.metrics import MetricsAnalyzer
-
-        analyzer = MetricsAnalyzer(self.neo4j)
-        metrics = analyzer.analyze_repository(self.project_id)
+        metrics = self.metrics_analyzer.analyze_repository(self.project_id)
 
         # Enrich with real static analysis
         self._enrich_metrics(metrics)
@@ -168,6 +171,9 @@ class CodeQualityAgent:
             # Note: This might overwrite Neo4j measurements, which is desired as Neo4j
             # currently uses a specific approximation.
             metrics["complexity_metrics"] = real_metrics
+            # The DB aggregates describe the replaced metrics; drop them so
+            # consumers derive the stats from the new list
+            metrics.pop("complexity_stats", None)
 
             # Re-calculate quality score based on new numbers
             from tools.metrics import MetricsAnalyzer
@@ -6,12 +6,22 @@ unified from src/core/git_helper.py and src/tools/git/client.py
 """
 
 import logging
+import os
 import subprocess
 from pathlib import Path
-from typing import Optional, List, Dict, Any, Union, Set
+from typing import Optional, List, Dict, Any, Union, Set, Iterator
 
 logger = logging.getLogger(__name__)
 
+# Field/record separators for machine-readable `git log --format` output
+_FS = "\x1f"
+_RS = "\x1e"
+
+
+def _git_env() -> Dict[str, str]:
+    """Environment for read-only git calls: no optional index locks/refresh, C locale."""
+    return {**os.environ, "GIT_OPTIONAL_LOCKS": "0", "LC_ALL": "C"}
+
 
 class GitHelper:
     """Git utilities for analysis integration."""
@@ -19,6 +29,8 @@ class GitHelper:
     def __init__(self, repo_path: Union[str, Path]):
         """Initialize git helper for a repository."""
         self.repo_path = Path(repo_path)
+        # Only a positive answer is cached; a directory may become a repo later
+        self._is_repo = False
 
     @property
     def is_git_repo(self) -> bool:
@@ -27,6 +39,8 @@ class GitHelper:
 
     def is_repository(self) -> bool:
         """Check if path is a git repository."""
+        if self._is_repo:
+            return True
         try:
             result = subprocess.run(
                 ["git", "rev-parse", "--git-dir"],
@@ -34,7 +48,8 @@ class GitHelper:
                 capture_output=True,
                 timeout=5,
             )
-            return result.returncode == 0
+            self._is_repo = result.returncode == 0
+            return self._is_repo
         except Exception:
             return False
 
@@ -62,15 +77,16 @@ class GitHelper:
         """
         try:
             result = subprocess.run(
-                ["git", "diff", "--name-only", f"{since_commit}..HEAD"],
+                ["git", "diff", "--name-only", "-z", f"{since_commit}..HEAD"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
                 timeout=10,
+                env=_git_env(),
             )
 
             if result.returncode == 0:
-                return [f for f in result.stdout.strip().split("\n") if f]
+                return [f for f in result.stdout.split("\0") if f]
 
             return None
         except Exception as e:
@@ -139,21 +155,103 @@ class GitHelper:
 
         try:
             result = subprocess.run(
-                ["git", "status", "--porcelain"],
+                ["git", "status", "--porcelain=v2", "--branch", "-z"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
+                env=_git_env(),
             )
 
-            return {
-                "status": "ok",
-                "changes": result.stdout,
-                "is_clean": result.returncode == 0 and not result.stdout,
-                "active_branch": self.get_branch(),
-            }
+            status = self._parse_porcelain_v2(result.stdout)
+            status["is_clean"] = result.returncode == 0 and not status["changes"]
+            status["status"] = "ok"
+            return status
         except Exception as e:
             return {"error": str(e)}
 
+    @staticmethod
+    def _parse_porcelain_v2(output: str) -> Dict[str, Any]:
+        """
+        Parse `git status --porcelain=v2 -z` output.
+
+        Returns the v1-style text summary under "changes" (for display) along
+        with staged, changed and untracked path lists. With ``--branch`` the
+        headers also provide the active branch and current commit.
+        """
+        lines = []
+        staged, changed, untracked = [], [], []
+        branch, commit = None, None
+
+        records = iter(output.split("\0"))
+        for record in records:
+            if not record:
+                continue
+            kind = record[0]
+            if kind == "#":
+                _, key, value = record.split(" ", 2)
+                if key == "branch.head":
+                    # Match `rev-parse --abbrev-ref HEAD` for detached HEAD
+                    branch = "HEAD" if value == "(detached)" else value
+                elif key == "branch.oid" and value != "(initial)":
+                    commit = value
+                continue
+            if kind == "?":
+                path = record[2:]
+                untracked.append(path)
+                lines.append(f"?? {path}")
+                continue
+            if kind not in "12u":
+                continue  # "!" ignored entries
+
+            # 1: 8 fields before path, 2: 9 (+ score), u: 10
+            n_fields = {"1": 8, "2": 9, "u": 10}[kind]
+            fields = record.split(" ", n_fields)
+            xy, path = fields[1], fields[-1]
+            x, y = xy[0], xy[1]
+            if x != ".":
+                staged.append(path)
+            if y != ".":
+                changed.append(path)
+
+            display = xy.replace(".", " ")
+            if kind == "2":
+                # Renames/copies carry the original path as the next record
+                orig = next(records, "")
+                lines.append(f"{display} {orig} -> {path}")
+            else:
+                lines.append(f"{display} {path}")
+
+        return {
+            "changes": "".join(f"{line}\n" for line in lines),
+            "staged_files": staged,
+            "changed_files": changed + untracked,
+            "untracked_files": untracked,
+            "active_branch": branch,
+            "current_commit": commit,
+        }
+
+    def snapshot(self, count: int = 10) -> Dict[str, Any]:
+        """
+        Collect status, branch, current commit, recent commits and remotes.
+
+        Uses three git invocations instead of one per getter: branch and
+        commit come from the ``status --branch`` headers.
+        """
+        if not self.is_repository():
+            return {"error": "Not a git repository"}
+
+        status = self.get_status()
+        if "error" in status:
+            return status
+
+        return {
+            "status": status,
+            "branch": status["active_branch"],
+            "commit": status["current_commit"],
+            "commits": self.get_commits(count),
+            "remotes": self.get_remotes(),
+        }
+
     def get_commits(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get recent commits"""
         if not self.is_repository():
@@ -161,22 +259,19 @@ class GitHelper:
 
         try:
             result = subprocess.run(
-                ["git", "log", f"-{count}", "--oneline"],
+                ["git", "log", f"-{count}", f"--format=%h{_FS}%s{_RS}"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
+                env=_git_env(),
             )
 
             commits = []
-            for line in result.stdout.strip().split("\n"):
-                if line:
-                    parts = line.split(" ", 1)
-                    commits.append(
-                        {
-                            "hash": parts[0],
-                            "message": parts[1] if len(parts) > 1 else "",
-                        }
-                    )
+            for record in result.stdout.split(_RS):
+                record = record.lstrip("\n")
+                if record:
+                    commit_hash, _, message = record.partition(_FS)
+                    commits.append({"hash": commit_hash, "message": message})
 
             return commits
         except Exception:
@@ -210,12 +305,13 @@ class GitHelper:
         try:
             # git diff --name-only <target> compares working tree to target
             result = subprocess.run(
-                ["git", "diff", "--name-only", target],
+                ["git", "diff", "--name-only", "-z", target],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
+                env=_git_env(),
             )
-            return [f for f in result.stdout.splitlines() if f.strip()]
+            return [f for f in result.stdout.split("\0") if f.strip()]
         except Exception:
             return []
 
@@ -225,19 +321,15 @@ class GitHelper:
             return []
 
         try:
+            # Plain `git remote` prints one name per line, no URL parsing needed
             result = subprocess.run(
-                ["git", "remote", "-v"],
+                ["git", "remote"],
                 cwd=self.repo_path,
                 capture_output=True,
                 text=True,
+                env=_git_env(),
             )
-
-            remotes = set()
-            for line in result.stdout.strip().split("\n"):
-                if line:
-                    remotes.add(line.split()[0])
-
-            return list(remotes)
+            return result.stdout.split()
         except Exception:
             return []
 
@@ -311,15 +403,45 @@ class GitHelper:
                 except:
                     return False
 
-    def get_diff(self, target: str = "HEAD") -> str:
-        """Get diff of current changes or compare with target."""
+    def iter_diff(
+        self, target: str = "HEAD", paths: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """
+        Stream the diff against target line by line.
+
+        Lines are yielded as git produces them, so memory stays constant for
+        large diffs and callers may stop early. Pass ``paths`` to scope the
+        diff to specific files.
+        """
+        cmd = ["git", "diff", target]
+        if paths:
+            cmd += ["--", *paths]
+
         try:
-            res = subprocess.run(
-                ["git", "diff", target],
+            proc = subprocess.Popen(
+                cmd,
                 cwd=self.repo_path,
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
+                bufsize=1,
             )
-            return res.stdout
+        except Exception as e:
+            logger.error(f"Failed to start git diff: {e}")
+            return
+
+        try:
+            yield from proc.stdout
+        finally:
+            proc.stdout.close()
+            if proc.poll() is None:
+                # Caller stopped early; don't wait for git to finish writing
+                proc.kill()
+            proc.wait()
+
+    def get_diff(self, target: str = "HEAD", paths: Optional[List[str]] = None) -> str:
+        """Get diff of current changes or compare with target."""
+        try:
+            return "".join(self.iter_diff(target, paths))
         except:
             return ""
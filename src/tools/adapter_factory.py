@@ -65,6 +65,17 @@ def get_graph_adapter(config: YaverConfig) -> Union[NetworkXAdapter, any]:
                             loc=loc,
                         )
 
+                def store_file_nodes(self, files, repo_name):
+                    query = """
+                    UNWIND $files AS file
+                    MERGE (f:File {path: file.file_path, repo_name: $repo_name})
+                    SET f.language = file.language,
+                        f.loc = file.loc,
+                        f.last_updated = datetime()
+                    """
+                    with self.driver.session() as session:
+                        session.run(query, files=files, repo_name=repo_name)
+
                 def store_code_structure(self, file_path, repo_name, structure):
                     with self.driver.session() as session:
                         # 1. Store Classes
@@ -130,6 +141,25 @@ def get_graph_adapter(config: YaverConfig) -> Union[NetworkXAdapter, any]:
                                     callee=callee,
                                 )
 
+                        # 5. Refresh n.degree of every node the edges above
+                        # can touch (the file, its neighbours, its callees)
+                        # so get_hubs stays current between ingests
+                        session.run(
+                            """
+                            MATCH (f:File {path: $path, repo_name: $repo_name})
+                            OPTIONAL MATCH (f)--(n)
+                            WITH f, collect(DISTINCT n) as neighbours
+                            OPTIONAL MATCH (f)-[:CONTAINS]->(:Function)-[:CALLS]->(callee)
+                            WITH [f] + neighbours + collect(DISTINCT callee) as touched
+                            UNWIND touched as t
+                            WITH DISTINCT t
+                            WHERE t:File OR t:Function OR t:Class
+                            SET t.degree = COUNT { (t)--() }
+                            """,
+                            path=file_path,
+                            repo_name=repo_name,
+                        )
+
                 def get_project_summary(self):
                     summary = "Project Graph Summary (Neo4j):\n"
                     query = "MATCH (n) RETURN labels(n) as label, count(n) as count"
@@ -173,6 +203,39 @@ def get_graph_adapter(config: YaverConfig) -> Union[NetworkXAdapter, any]:
                         else "No structural context found."
                     )
 
+                def update_degrees(self, repo_name):
+                    """
+                    Store each repo node's relationship count as n.degree so
+                    hub lookups are an indexed ORDER BY instead of a full
+                    MATCH-and-count. Run after ingestion to backfill; later
+                    store_code_structure writes refresh the nodes they touch.
+                    """
+                    with self.driver.session() as session:
+                        for label in ("File", "Class", "Function"):
+                            session.run(
+                                f"CREATE INDEX IF NOT EXISTS FOR (n:{label}) ON (n.degree)"
+                            )
+                        session.run(
+                            """
+                            MATCH (n:File|Function|Class {repo_name: $repo_name})
+                            SET n.degree = COUNT { (n)--() }
+                            """,
+                            repo_name=repo_name,
+                        )
+
+                def get_hubs(self, repo_name, limit=5):
+                    # Labelled so the planner can use the degree indexes
+                    query = """
+                    MATCH (n:File|Function|Class)
+                    WHERE n.repo_name = $repo_name AND n.degree > 0
+                    RETURN coalesce(n.path, n.file_path) as file, n.name as symbol, labels(n)[0] as type, n.degree as degree
+                    ORDER BY n.degree DESC
+                    LIMIT $limit
+                    """
+                    with self.driver.session() as session:
+                        results = session.run(query, repo_name=repo_name, limit=limit)
+                        return [record.data() for record in results]
+
                 def find_nodes_by_name(self, name: str):
                     query = """
                     MATCH (n)
@@ -2,7 +2,7 @@
 Build Analyzer Module
 Identifies build systems and specific build contexts for files.
 """
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 from pathlib import Path
 import re
 
@@ -14,6 +14,10 @@ class BuildAnalyzer:
         self.workspace_root = Path(workspace_root)
         self.build_systems = []
         self._detect_build_systems()
+        # The context only depends on the file name, so it is computed once
+        # per name; the Makefile rules are read once per analyzer.
+        self._context_cache: Dict[str, Dict[str, Any]] = {}
+        self._makefile_rules: Optional[List[Tuple[str, str]]] = None
 
     def _detect_build_systems(self):
         """Identify what build systems are present."""
@@ -36,6 +40,17 @@ class BuildAnalyzer:
         path = Path(file_path).absolute()
         rel_path = path.relative_to(self.workspace_root)
 
+        cached = self._context_cache.get(rel_path.name)
+        if cached is None:
+            cached = self._build_context(path, rel_path)
+            self._context_cache[rel_path.name] = cached
+        return {
+            "build_type": cached["build_type"],
+            "commands": list(cached["commands"]),
+        }
+
+    def _build_context(self, path: Path, rel_path: Path) -> Dict[str, Any]:
+        """Compute the build context for a file (see get_build_context_for_file)."""
         context = {"build_type": "unknown", "commands": []}
 
         # 1. Makefile Heuristics
@@ -58,39 +73,40 @@ class BuildAnalyzer:
 
         return context
 
-    def _analyze_makefile(
-        self, makefile_path: Path, rel_source_path: Path
-    ) -> List[str]:
+    def _load_makefile_rules(self, makefile_path: Path) -> List[Tuple[str, str]]:
         """
-        Basic regex parsing of Makefile to find targets that might depend on the file.
-        This is not a full parser, just heuristics.
+        Read the Makefile once and keep (target, rest-of-line) for every
+        line that defines a target.
         """
-        try:
-            with open(makefile_path, "r", encoding="utf-8") as f:
-                content = f.read()
-
-            # Look for targets that explicitly mention the file (e.g. main.o: main.c)
-            # or generic patterns %.o: %.c
-
-            targets = []
-
-            # Simple direct match
-            # target: ... dependency ...
-            # We look for lines starting with 'target:' that contain the filename
-            file_name = rel_source_path.name
+        if self._makefile_rules is None:
+            rules = []
+            try:
+                with open(makefile_path, "r", encoding="utf-8") as f:
+                    content = f.read()
+            except Exception:
+                content = ""
 
             # Regex for target definitions
-            target_pattern = re.compile(r"^(\w+):.*" + re.escape(file_name))
-
+            target_pattern = re.compile(r"^(\w+):(.*)")
             for line in content.splitlines():
                 match = target_pattern.match(line)
                 if match:
-                    targets.append(match.group(1))
+                    rules.append((match.group(1), match.group(2)))
+            self._makefile_rules = rules
+        return self._makefile_rules
 
-            # Removed aggressive fallback to "all" to avoid false positives for unrelated files
-            # if not targets and "all" in content:
-            #      targets.append("all")
-
-            return targets
-        except Exception:
-            return []
+    def _analyze_makefile(
+        self, makefile_path: Path, rel_source_path: Path
+    ) -> List[str]:
+        """
+        Basic matching of Makefile rules to find targets that might depend on the file.
+        This is not a full parser, just heuristics.
+        """
+        # Look for targets that explicitly mention the file (e.g. main.o: main.c)
+        # target: ... dependency ...
+        file_name = rel_source_path.name
+        return [
+            target
+            for target, rest in self._load_makefile_rules(makefile_path)
+            if file_name in rest
+        ]
@@ -6,8 +6,11 @@ Refactored from git_analysis.py
 import os
 import hashlib
 import logging
+import shutil
+import subprocess
+from multiprocessing import Pool
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 
 from tools.base import Tool
 from tools.analysis.parser import CodeParser
@@ -15,6 +18,92 @@ from tools.analysis.graph import GraphIndexer, ImpactAnalyzer
 
 logger = logging.getLogger("tools.analysis.engine")
 
+# Below this many files, process start-up costs more than parsing serially
+PARALLEL_PARSE_THRESHOLD = 256
+
+# Same list as in agent_git_analyzer, should ideally be shared constant.
+SUPPORTED_EXTENSIONS = frozenset(
+    {
+        ".py",
+        ".c",
+        ".cpp",
+        ".cc",
+        ".h",
+        ".hpp",
+        ".java",
+        ".js",
+        ".ts",
+        ".jsx",
+        ".tsx",
+    }
+)
+
+_GIT_CLONE_ARGS = ["--depth", "1", "--single-branch", "--filter=blob:none"]
+
+_worker_parser: Optional[CodeParser] = None
+
+
+def _parse_file_worker(file_path: str) -> Dict[str, Any]:
+    """Pool entry point: parse one file with a per-process CodeParser."""
+    global _worker_parser
+    if _worker_parser is None:
+        _worker_parser = CodeParser()
+    return _worker_parser.parse_file(file_path)
+
+
+def _scan_files(path) -> Iterator[os.DirEntry]:
+    """Recursively yield file entries under path, skipping .git directories."""
+    with os.scandir(path) as it:
+        for entry in it:
+            if entry.is_dir():
+                # Like os.walk, don't descend into symlinked directories
+                if entry.name != ".git" and not entry.is_symlink():
+                    yield from _scan_files(entry.path)
+            else:
+                yield entry
+
+
+def _git_ls_files(path: Path) -> Optional[List[str]]:
+    """Tracked plus untracked-but-not-ignored files, or None if git can't list them."""
+    try:
+        result = subprocess.run(
+            [
+                "git",
+                "-C",
+                str(path),
+                "ls-files",
+                "-z",
+                "--cached",
+                "--others",
+                "--exclude-standard",
+            ],
+            capture_output=True,
+            check=True,
+            timeout=60,
+        )
+    except (OSError, subprocess.SubprocessError) as e:
+        logger.debug(f"git ls-files failed in {path}, walking instead: {e}")
+        return None
+    return [os.fsdecode(p) for p in result.stdout.split(b"\x00") if p]
+
+
+def _repo_files(path: Path) -> Iterator[Tuple[str, str]]:
+    """
+    Yield (file name, full path) for files in the repo.
+    Inside a git repo this asks git, which honours .gitignore and skips
+    node_modules/.venv/build output; otherwise it walks the tree.
+    """
+    if (path / ".git").exists():
+        rel_paths = _git_ls_files(path)
+        if rel_paths is not None:
+            # ls-files lists each path once per merge stage; dict keeps order
+            for rel in dict.fromkeys(rel_paths):
+                yield rel.rpartition("/")[2], os.path.join(path, rel)
+            return
+
+    for entry in _scan_files(path):
+        yield entry.name, entry.path
+
 
 class RepoManager:
     """Manages Git repository operations with caching."""
@@ -30,7 +119,7 @@ class RepoManager:
             return {"path": str(Path(repo_source).resolve()), "type": "local"}
 
         # Remote repo logic
-        repo_hash = hashlib.md5(repo_source.encode()).hexdigest()
+        repo_hash = hashlib.blake2b(repo_source.encode(), digest_size=8).hexdigest()
         target_path = self.cache_dir / repo_hash
 
         if target_path.exists():
@@ -39,8 +128,30 @@ class RepoManager:
             return {"path": str(target_path), "type": "cached"}
 
         logger.info(f"Cloning {repo_source} to {target_path}...")
-        # Use simple git clone for now
-        os.system(f"git clone {repo_source} {target_path}")
+        # Shallow, blobless clone: analysis only needs the current tree.
+        # "--" stops a source starting with "-" being read as a git option.
+        try:
+            subprocess.run(
+                [
+                    "git",
+                    "clone",
+                    *_GIT_CLONE_ARGS,
+                    "--",
+                    repo_source,
+                    str(target_path),
+                ],
+                check=True,
+                capture_output=True,
+                timeout=600,
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            stderr = getattr(e, "stderr", None) or b""
+            logger.error(
+                f"Failed to clone {repo_source}: {stderr.decode().strip() or e}"
+            )
+            # Don't leave a partial checkout that would later look cached
+            shutil.rmtree(target_path, ignore_errors=True)
+            return {"path": str(target_path), "type": "error"}
         return {"path": str(target_path), "type": "cloned"}
 
 
@@ -52,7 +163,8 @@ class AnalysisEngineSchema(BaseModel):
         ".", description="Path to repository (default: current dir)"
     )
     analysis_type: str = Field(
-        "overview", description="Type: 'overview', 'structure', 'graph_index'"
+        "overview",
+        description="Type: 'overview', 'structure', 'full', 'graph_index'",
     )
 
 
@@ -66,7 +178,9 @@ class AnalysisEngine(Tool):
     description = "Static analysis engine (overview, structure, impact)"
     args_schema = AnalysisEngineSchema
 
-    def __init__(self):
+    def __init__(self, n_cpus: Optional[int] = None, chunksize: int = 64):
+        self.n_cpus = n_cpus or os.cpu_count() or 1
+        self.chunksize = chunksize
         self.repo_manager = RepoManager()
         self.parser = CodeParser()
         self.graph_indexer = GraphIndexer()
@@ -86,7 +200,7 @@ class AnalysisEngine(Tool):
     ) -> Dict[str, Any]:
         """
         Perform analysis on a repository.
-        analysis_type: 'overview', 'structure', 'search', 'graph_index', 'impact'
+        analysis_type: 'overview', 'structure', 'full', 'search', 'graph_index', 'impact'
         """
         repo_info = self.repo_manager.get_repo(repo_source)
         repo_path = Path(repo_info["path"])
@@ -96,11 +210,15 @@ class AnalysisEngine(Tool):
 
         if analysis_type == "overview":
             return self._generate_overview(repo_path)
+        elif analysis_type == "full":
+            return self._generate_full(repo_path)
         elif analysis_type == "structure":
             return self._generate_structure(repo_path)
         elif analysis_type == "graph_index":
             structure = self._generate_structure(repo_path).get("structure", [])
-            return self.graph_indexer.index_repo(structure)
+            result = self.graph_indexer.index_repo(structure)
+            self.impact_analyzer.invalidate_cache()
+            return result
         elif analysis_type == "impact":
             if not target:
                 return {"error": "Target parameter required for impact analysis"}
@@ -110,50 +228,73 @@ class AnalysisEngine(Tool):
 
         return {"error": "Unknown analysis type"}
 
-    def _generate_overview(self, path: Path) -> Dict[str, Any]:
+    def _scan_repo(
+        self, path: Path, collect_stats: bool = True
+    ) -> Tuple[Dict[str, Any], List[str]]:
+        """
+        Single walk producing both the overview stats and the list of
+        parseable source files, so combined analyses traverse the tree once.
+        """
         file_counts = {}
         total_files = 0
         total_size = 0
+        files_to_parse = []
 
-        for root, _, files in os.walk(path):
-            if ".git" in root:
-                continue
-            for file in files:
+        for name, full_path in _repo_files(path):
+            if collect_stats:
+                try:
+                    size = os.stat(full_path).st_size
+                except OSError:
+                    # Tracked by git but deleted from the working tree
+                    continue
                 total_files += 1
-                ext = Path(file).suffix
+                ext = os.path.splitext(name)[1]
                 file_counts[ext] = file_counts.get(ext, 0) + 1
-                total_size += (Path(root) / file).stat().st_size
+                total_size += size
 
-        return {
+            dot = name.rfind(".")
+            if dot >= 0 and name[dot:].lower() in SUPPORTED_EXTENSIONS:
+                files_to_parse.append(full_path)
+
+        overview = {
             "summary": "Repository Overview",
             "files": total_files,
             "size_kb": total_size / 1024,
             "languages": file_counts,
         }
+        return overview, files_to_parse
+
+    def _generate_overview(self, path: Path) -> Dict[str, Any]:
+        return self._scan_repo(path)[0]
+
+    def _collect_source_files(self, path: Path) -> List[str]:
+        """Walk the repo and return paths of files the parser supports."""
+        return self._scan_repo(path, collect_stats=False)[1]
+
+    def _generate_full(self, path: Path) -> Dict[str, Any]:
+        """Overview and structure from one directory walk."""
+        overview, files_to_parse = self._scan_repo(path)
+        return {**overview, **self._generate_structure(path, files_to_parse)}
+
+    def _generate_structure(
+        self, path: Path, files_to_parse: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        if files_to_parse is None:
+            files_to_parse = self._collect_source_files(path)
+
+        if self.n_cpus <= 1 or len(files_to_parse) < PARALLEL_PARSE_THRESHOLD:
+            structure = [self.parser.parse_file(fp) for fp in files_to_parse]
+            return {"structure": structure}
+
+        try:
+            with Pool(processes=self.n_cpus) as pool:
+                structure = list(
+                    pool.imap(
+                        _parse_file_worker, files_to_parse, chunksize=self.chunksize
+                    )
+                )
+        except Exception as e:
+            logger.warning(f"Parallel parsing failed, falling back to serial: {e}")
+            structure = [self.parser.parse_file(fp) for fp in files_to_parse]
 
-    def _generate_structure(self, path: Path) -> Dict[str, Any]:
-        structure = []
-        # Same list as in agent_git_analyzer, should ideally be shared constant.
-        supported_ext = {
-            ".py",
-            ".c",
-            ".cpp",
-            ".cc",
-            ".h",
-            ".hpp",
-            ".java",
-            ".js",
-            ".ts",
-            ".jsx",
-            ".tsx",
-        }
-        for root, _, files in os.walk(path):
-            if ".git" in root:
-                continue
-            for file in files:
-                ext = Path(file).suffix.lower()
-                if ext in supported_ext:
-                    full_path = Path(root) / file
-                    analysis = self.parser.parse_file(str(full_path))
-                    structure.append(analysis)
         return {"structure": structure}
@@ -3,8 +3,10 @@ Graph Analysis Module
 Extracted from git_analysis.py
 """
 
+import atexit
 import logging
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, List, Optional, Tuple
 from config.config import Neo4jConfig
 
 logger = logging.getLogger("tools.analysis.graph")
@@ -15,6 +17,59 @@ except ImportError:
     GraphDatabase = None
 
 
+# Characters that break mermaid node ids
+_MERMAID_TR = str.maketrans({" ": "_", ".": "_", "-": "_", "/": "_"})
+
+# LIMIT is a parameter so the server reuses one plan for any limit
+_CALL_GRAPH_REPO_QUERY = """
+MATCH (caller:Function {repo_name: $repo_name})-[:CALLS]->(callee:Function)
+RETURN caller.name as source, callee.name as target
+LIMIT $limit
+"""
+_CALL_GRAPH_QUERY = """
+MATCH (caller:Function)-[:CALLS]->(callee:Function)
+RETURN caller.name as source, callee.name as target
+LIMIT $limit
+"""
+
+MAX_IMPACT_DEPTH = 5
+_TRANSITIVE_QUERY = """
+MATCH path = (source)-[:CALLS*1..{depth}]->(target {{name: $name}})
+RETURN count(path) as n
+"""
+_TRANSITIVE_QUERIES = {
+    depth: _TRANSITIVE_QUERY.format(depth=depth)
+    for depth in range(1, MAX_IMPACT_DEPTH + 1)
+}
+
+_DRIVER = None
+# Schema DDL only needs to run once per driver lifetime
+_SCHEMA_INITIALIZED = False
+
+
+def _close_driver():
+    global _DRIVER, _SCHEMA_INITIALIZED
+    if _DRIVER is not None:
+        _DRIVER.close()
+        _DRIVER = None
+        _SCHEMA_INITIALIZED = False
+
+
+def _get_driver():
+    """Return the process-wide Neo4j driver, creating it on first use."""
+    global _DRIVER
+    if _DRIVER is None and GraphDatabase:
+        config = Neo4jConfig()
+        _DRIVER = GraphDatabase.driver(
+            config.uri,
+            auth=(config.user, config.password),
+            encrypted=False,
+            max_connection_pool_size=50,
+        )
+        atexit.register(_close_driver)
+    return _DRIVER
+
+
 class GraphIndexer:
     """Indexes code structure into Neo4j."""
 
@@ -23,102 +78,139 @@ class GraphIndexer:
         self.driver = None
         if GraphDatabase:
             try:
-                self.driver = GraphDatabase.driver(
-                    self.config.uri,
-                    auth=(self.config.username, self.config.password),
-                    encrypted=False,
-                )
+                self.driver = _get_driver()
             except Exception as e:
                 logger.error(f"Failed to connect to Neo4j: {e}")
         else:
             logger.warning("neo4j package not found")
 
     def close(self):
-        if self.driver:
-            self.driver.close()
+        # The driver is shared with other analyzers and closed at exit
+        self.driver = None
 
-    def index_repo(self, structure: List[Dict[str, Any]]):
+    def index_repo(self, structure: List[Dict[str, Any]], batch_size: int = 50):
         """Push parsed structure to Graph DB."""
         if not self.driver:
             return {"error": "No Neo4j connection"}
 
+        # Files that failed to parse carry no name and nothing to index
+        files = [info for info in structure if "file" in info]
+
         with self.driver.session() as session:
-            # Create constraints (optional but good)
-            session.run(
-                "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE f.name IS UNIQUE"
-            )
+            self._ensure_schema(session)
 
             count = 0
-            for file_info in structure:
-                session.execute_write(self._create_file_nodes, file_info)
-                count += 1
+            for i in range(0, len(files), batch_size):
+                batch = files[i : i + batch_size]
+                session.execute_write(self._create_file_nodes, self._build_rows(batch))
+                count += len(batch)
 
         return {"indexed_files": count}
 
     @staticmethod
-    def _create_file_nodes(tx, file_info):
-        # Create File Node
+    def _ensure_schema(session):
+        global _SCHEMA_INITIALIZED
+        if _SCHEMA_INITIALIZED:
+            return
+        # Create constraints (optional but good)
+        session.run(
+            "CREATE CONSTRAINT IF NOT EXISTS FOR (f:File) REQUIRE f.name IS UNIQUE"
+        )
+        _SCHEMA_INITIALIZED = True
+
+    @staticmethod
+    def _build_rows(batch: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+        """Flatten a batch of parse results into UNWIND parameter rows."""
+        rows = {"files": [], "funcs": [], "classes": [], "imports": [], "calls": []}
+        for file_info in batch:
+            name = file_info["file"]
+            rows["files"].append({"name": name, "loc": file_info.get("loc", 0)})
+            rows["funcs"].extend(
+                {"name": func, "file": name} for func in file_info.get("functions", [])
+            )
+            rows["classes"].extend(
+                {"name": cls, "file": name} for cls in file_info.get("classes", [])
+            )
+            # Duplicates would only cost MERGE work; drop them before sending
+            rows["imports"].extend(
+                {"name": imp, "file": name}
+                for imp in dict.fromkeys(file_info.get("imports", []))
+            )
+            calls = dict.fromkeys(
+                (call["caller"], call["callee"]) for call in file_info.get("calls", [])
+            )
+            rows["calls"].extend(
+                {"caller": caller, "callee": callee, "file": name}
+                for caller, callee in calls
+            )
+        return rows
+
+    @staticmethod
+    def _create_file_nodes(tx, rows):
+        # One UNWIND round-trip per entity kind for the whole batch
+        # Create File Nodes
         query_file = """
-        MERGE (f:File {name: $name})
-        SET f.loc = $loc
+        UNWIND $rows AS r
+        MERGE (f:File {name: r.name})
+        SET f.loc = r.loc
         """
-        tx.run(query_file, name=file_info["file"], loc=file_info.get("loc", 0))
+        tx.run(query_file, rows=rows["files"])
 
         # Create Functions and Relationships
-        for func in file_info.get("functions", []):
+        if rows["funcs"]:
             query_func = """
-            MERGE (fn:Function {name: $func_name, file: $file_name})
-            MERGE (f:File {name: $file_name})
+            UNWIND $rows AS r
+            MERGE (fn:Function {name: r.name, file: r.file})
+            MERGE (f:File {name: r.file})
             MERGE (f)-[:DEFINES]->(fn)
             """
-            tx.run(query_func, func_name=func, file_name=file_info["file"])
+            tx.run(query_func, rows=rows["funcs"])
 
         # Create Classes
-        for cls in file_info.get("classes", []):
+        if rows["classes"]:
             query_cls = """
-            MERGE (c:Class {name: $cls_name, file: $file_name})
-            MERGE (f:File {name: $file_name})
+            UNWIND $rows AS r
+            MERGE (c:Class {name: r.name, file: r.file})
+            MERGE (f:File {name: r.file})
             MERGE (f)-[:DEFINES]->(c)
             """
-            tx.run(query_cls, cls_name=cls, file_name=file_info["file"])
+            tx.run(query_cls, rows=rows["classes"])
 
         # Create Imports (Simple dependency)
-        for imp in file_info.get("imports", []):
+        if rows["imports"]:
             query_imp = """
-            MERGE (f:File {name: $file_name})
-            MERGE (i:Module {name: $imp_name})
+            UNWIND $rows AS r
+            MERGE (f:File {name: r.file})
+            MERGE (i:Module {name: r.name})
             MERGE (f)-[:IMPORTS]->(i)
             """
-            tx.run(query_imp, file_name=file_info["file"], imp_name=imp)
+            tx.run(query_imp, rows=rows["imports"])
 
         # Create Calls
-        for call in file_info.get("calls", []):
+        if rows["calls"]:
             query_call = """
-            MATCH (caller:Function {name: $caller_name, file: $file_name})
-            MERGE (callee {name: $callee_name})
+            UNWIND $rows AS r
+            MATCH (caller:Function {name: r.caller, file: r.file})
+            MERGE (callee {name: r.callee})
             MERGE (caller)-[:CALLS]->(callee)
             """
-            tx.run(
-                query_call,
-                caller_name=call["caller"],
-                callee_name=call["callee"],
-                file_name=file_info["file"],
-            )
+            tx.run(query_call, rows=rows["calls"])
 
 
 class ImpactAnalyzer:
     """Analyzes change impact using Neo4j Graph."""
 
-    def __init__(self):
+    def __init__(self, call_graph_ttl: int = 60):
         self.config = Neo4jConfig()
+        # (repo_name, limit) -> (timestamp, result)
+        self._cg_cache: Dict[
+            Tuple[Optional[str], int], Tuple[float, Dict[str, str]]
+        ] = {}
+        self._cg_ttl = call_graph_ttl
         self.driver = None
         if GraphDatabase:
             try:
-                self.driver = GraphDatabase.driver(
-                    self.config.uri,
-                    auth=(self.config.username, self.config.password),
-                    encrypted=False,
-                )
+                self.driver = _get_driver()
             except Exception as e:
                 logger.error(f"Failed to connect to Neo4j for Impact Analysis: {e}")
 
@@ -129,32 +221,38 @@ class ImpactAnalyzer:
         if not self.driver:
             return {"error": "Neo4j connection missing"}
 
+        key = (repo_name, limit)
+        cached = self._cg_cache.get(key)
+        if cached and time.monotonic() - cached[0] < self._cg_ttl:
+            return cached[1]
+
         with self.driver.session() as session:
             if repo_name:
-                query = f"""
-                MATCH (caller:Function {{repo_name: $repo_name}})-[:CALLS]->(callee:Function)
-                RETURN caller.name as source, callee.name as target
-                LIMIT {limit}
-                """
-                params = {"repo_name": repo_name}
+                query = _CALL_GRAPH_REPO_QUERY
+                params = {"repo_name": repo_name, "limit": int(limit)}
             else:
-                query = f"""
-                MATCH (caller:Function)-[:CALLS]->(callee:Function)
-                RETURN caller.name as source, callee.name as target
-                LIMIT {limit}
-                """
-                params = {}
+                query = _CALL_GRAPH_QUERY
+                params = {"limit": int(limit)}
 
             results = session.run(query, parameters=params).data()  # type: ignore
 
-            mermaid = ["graph TD"]
-            for r in results:
-                # Sanitization for mermaid
-                src = r["source"].replace(" ", "_").replace(".", "_")
-                tgt = r["target"].replace(" ", "_").replace(".", "_")
-                mermaid.append(f"    {src} --> {tgt}")
+            # Sanitization for mermaid (single C-level pass per name)
+            mermaid = [
+                "graph TD",
+                *(
+                    f"    {r['source'].translate(_MERMAID_TR)}"
+                    f" --> {r['target'].translate(_MERMAID_TR)}"
+                    for r in results
+                ),
+            ]
 
-            return {"mermaid": "\n".join(mermaid)}
+            result = {"mermaid": "\n".join(mermaid)}
+            self._cg_cache[key] = (time.monotonic(), result)
+            return result
+
+    def invalidate_cache(self):
+        """Drop memoized call graphs (e.g. after the graph was re-indexed)."""
+        self._cg_cache.clear()
 
     def analyze(self, target_name: str, depth: int = 2) -> Dict[str, Any]:
         """Find what depends on target_name."""
@@ -162,39 +260,41 @@ class ImpactAnalyzer:
             return {"error": "Neo4j connection missing"}
 
         with self.driver.session() as session:
+            affected_files = set()
+
             # 1. Direct callers (Functions calling target)
             query_direct = """
             MATCH (caller:Function)-[:DEFINES|CALLS]->(target {name: $name})
             RETURN caller.name as caller, caller.file as file
             """
-            direct_deps = session.run(query_direct, name=target_name).data()  # type: ignore
+            direct_deps = []
+            for record in session.run(query_direct, name=target_name):  # type: ignore
+                direct_deps.append({"caller": record["caller"], "file": record["file"]})
+                affected_files.add(record["file"])
 
             # 2. Files importing target (if target is a module/file concept)
             query_imports = """
             MATCH (f:File)-[:IMPORTS]->(m:Module {name: $name})
             RETURN f.name as file
             """
-            import_deps = session.run(query_imports, name=target_name).data()  # type: ignore
+            import_deps = []
+            for record in session.run(query_imports, name=target_name):  # type: ignore
+                import_deps.append({"file": record["file"]})
+                affected_files.add(record["file"])
 
             # 3. Transitive impact (simplified)
-            # Find chains: (Something) -> ... -> (Target)
-            query_transitive = f"""
-            MATCH path = (source)-[:CALLS*1..{depth}]->(target {{name: $name}})
-            RETURN source.name as source, length(path) as hops
-            """
-            transitive_deps = session.run(query_transitive, name=target_name).data()  # type: ignore
-
-            affected_files = set()
-            for d in direct_deps:
-                affected_files.add(d["file"])
-            for i in import_deps:
-                affected_files.add(i["file"])
+            # Find chains: (Something) -> ... -> (Target); only the count is used
+            # Path bounds can't be parameters; use one fixed text per depth
+            depth = min(max(int(depth), 1), MAX_IMPACT_DEPTH)
+            query_transitive = _TRANSITIVE_QUERIES[depth]
+            record = session.run(query_transitive, name=target_name).single()  # type: ignore
+            transitive_count = record["n"] if record else 0
 
             return {
                 "target": target_name,
                 "direct_dependents": direct_deps,
                 "importers": import_deps,
-                "transitive_count": len(transitive_deps),
+                "transitive_count": transitive_count,
                 "affected_files": list(affected_files),
                 "risk_level": "High" if len(affected_files) > 5 else "Low",
             }
@@ -4,10 +4,22 @@ Extracted from git_analysis.py
 """
 
 import ast
+import functools
+import hashlib
+import json
+import logging
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, Any, List, Optional, Set
+from typing import Dict, Any, List, Optional, Set, Tuple
 import re
 
+logger = logging.getLogger("tools.analysis.parser")
+
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
 # Attempt to import tree-sitter-languages
 TREE_SITTER_AVAILABLE = False
 try:
@@ -18,9 +30,184 @@ except ImportError:
     pass
 
 
+# Simple C-function regex: Type Name(Args) {
+# Limiting to common C patterns to avoid false positives
+# Improved regex to handle pointers and attributes better
+_FUNC_RE = re.compile(r"^\s*(?:[\w\*]+\s+)+(\w+)\s*\(", re.MULTILINE)
+_CLASS_RE = re.compile(r"^\s*class\s+(\w+)", re.MULTILINE)
+_INCLUDE_RE = re.compile(r'#include\s+[<"](.+)[>"]')
+# Line-scoped scanner for call extraction. "fdef" matches a function start
+# with "{" on the same line and swallows the rest of that line; "call" matches
+# name( tokens. [^\S\n] keeps every match within a single line.
+_SCOPE_RE = re.compile(
+    r"(?P<fdef>^[^\S\n]*(?:[\w\*]+[^\S\n]+)+(?P<fname>\w+)[^\S\n]*\((?=[^\n]*\{)[^\n]*)"
+    r"|(?P<call>(?P<cname>\w+)[^\S\n]*\()",
+    re.MULTILINE,
+)
+
+# Control structures that look like function definitions (e.g. "else if").
+# 'main' is allowed because it's a critical entry point function.
+_BLACKLIST = frozenset(
+    {
+        "if",
+        "while",
+        "switch",
+        "for",
+        "catch",
+        "return",
+        "sizeof",
+        "else",
+        "define",
+    }
+)
+
+# Bump when the shape of parse results changes to invalidate old cache entries
+PARSE_CACHE_VERSION = 5
+MEMORY_CACHE_SIZE = 512
+# Larger .py files are almost always generated; skip parsing them
+MAX_PYTHON_FILE_SIZE = 2_000_000
+
+
+def _content_hash(data: bytes) -> str:
+    """Fast, non-cryptographic content hash used as the parse cache key."""
+    if xxhash is not None:
+        return xxhash.xxh3_64_hexdigest(data)
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _content_cached(parse_method):
+    """
+    Cache a parse method's result by file content.
+
+    Results are kept in a per-parser in-memory LRU and persisted as JSON under
+    ``cache_dir/<hash[:2]>/<hash>.json``, so unchanged files are not re-parsed
+    across runs. Error results are never cached. The file is read once here
+    and its bytes are handed to the wrapped method.
+    """
+
+    @functools.wraps(parse_method)
+    def wrapper(self, path: Path) -> Dict[str, Any]:
+        try:
+            data = path.read_bytes()
+        except Exception as e:
+            return {"error": str(e)}
+
+        key = f"{parse_method.__name__}-v{PARSE_CACHE_VERSION}-{_content_hash(data)}"
+
+        result = self._memory_cache.get(key)
+        if result is not None:
+            self._memory_cache.move_to_end(key)
+        else:
+            result = self._load_cached(key)
+            if result is None:
+                result = parse_method(self, path, data)
+                if "error" in result:
+                    return result
+                self._store_cached(key, result)
+            self._memory_cache[key] = result
+            if len(self._memory_cache) > MEMORY_CACHE_SIZE:
+                self._memory_cache.popitem(last=False)
+
+        # Content-keyed, so identical files share an entry; the name may differ
+        return {**result, "file": path.name}
+
+    return wrapper
+
+
+class _PyCollector(ast.NodeVisitor):
+    """Collects functions, classes, imports and calls in a single AST pass."""
+
+    def __init__(self):
+        self.functions: List[str] = []
+        self.classes: List[str] = []
+        # Insertion-ordered sets: repeated imports/calls add nothing downstream
+        self._imports: Dict[str, None] = {}
+        self._calls: Dict[Tuple[str, str], None] = {}
+        self._func_stack: List[str] = []
+
+    @property
+    def imports(self) -> List[str]:
+        return list(self._imports)
+
+    @property
+    def calls(self) -> List[Dict[str, str]]:
+        return [{"caller": caller, "callee": callee} for caller, callee in self._calls]
+
+    def _visit_function(self, node):
+        self.functions.append(node.name)
+        self._func_stack.append(node.name)
+        self.generic_visit(node)
+        self._func_stack.pop()
+
+    visit_FunctionDef = _visit_function
+    visit_AsyncFunctionDef = _visit_function
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        self.classes.append(node.name)
+        self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        self._imports[node.names[0].name] = None
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        if node.module:
+            self._imports[node.module] = None
+
+    def visit_Call(self, node: ast.Call):
+        # Calls are attributed to the innermost enclosing function
+        if self._func_stack:
+            func = node.func
+            callee_name = None
+            if isinstance(func, ast.Name):
+                callee_name = func.id
+            elif isinstance(func, ast.Attribute):
+                callee_name = func.attr
+
+            if callee_name:
+                self._calls[(self._func_stack[-1], callee_name)] = None
+        self.generic_visit(node)
+
+
 class CodeParser:
     """Parses code to extract structural information (AST-based + Tree-Sitter + Regex fallback)."""
 
+    def __init__(self, cache_dir: Optional[str] = "~/.yaver/cache/parser"):
+        """
+        Args:
+            cache_dir: Directory for the on-disk parse cache (None disables it),
+                kept in the ~/.yaver state directory rather than the CWD
+        """
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        self._memory_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    def _cache_path(self, key: str) -> Path:
+        digest = key.rsplit("-", 1)[-1]
+        return self.cache_dir / digest[:2] / f"{key}.json"
+
+    def _load_cached(self, key: str) -> Optional[Dict[str, Any]]:
+        if not self.cache_dir:
+            return None
+        cache_path = self._cache_path(key)
+        if not cache_path.exists():
+            return None
+        try:
+            with open(cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except Exception as e:
+            logger.debug(f"Ignoring unreadable parse cache {cache_path}: {e}")
+            return None
+
+    def _store_cached(self, key: str, result: Dict[str, Any]):
+        if not self.cache_dir:
+            return
+        cache_path = self._cache_path(key)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(cache_path, "w", encoding="utf-8") as f:
+                json.dump(result, f)
+        except Exception as e:
+            logger.debug(f"Failed to write parse cache {cache_path}: {e}")
+
     def parse_file(self, file_path: str) -> Dict[str, Any]:
         """Parse a file to extract functions, classes, and calls."""
         path = Path(file_path)
@@ -75,58 +262,30 @@ class CodeParser:
 
         return {"error": "Unsupported file type", "details": f"No parser for {suffix}"}
 
-    def _parse_python(self, path: Path) -> Dict[str, Any]:
+    @_content_cached
+    def _parse_python(self, path: Path, data: bytes) -> Dict[str, Any]:
+        # Counting newlines in bytes avoids decoding and splitting the file
+        loc = data.count(b"\n") + (bool(data) and not data.endswith(b"\n"))
+        if len(data) > MAX_PYTHON_FILE_SIZE:
+            return {"error": "file too large", "loc": loc}
+
         try:
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+            # ast.parse decodes bytes itself, honouring PEP 263 coding cookies
+            tree = ast.parse(data, filename=str(path), type_comments=False)
+        except (SyntaxError, ValueError) as e:
+            return {"error": f"SyntaxError: {e}", "loc": loc}
 
-            tree = ast.parse(content)
-
-            functions = [
-                node.name
-                for node in ast.walk(tree)
-                if isinstance(node, ast.FunctionDef)
-            ]
-            classes = [
-                node.name for node in ast.walk(tree) if isinstance(node, ast.ClassDef)
-            ]
-            imports = [
-                node.names[0].name
-                for node in ast.walk(tree)
-                if isinstance(node, ast.Import)
-            ]
-            imports += [
-                node.module
-                for node in ast.walk(tree)
-                if isinstance(node, ast.ImportFrom) and node.module
-            ]
-
-            # Extract calls
-            calls = []
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    caller_name = node.name
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.Call):
-                            func = child.func
-                            callee_name = None
-                            if isinstance(func, ast.Name):
-                                callee_name = func.id
-                            elif isinstance(func, ast.Attribute):
-                                callee_name = func.attr
-
-                            if callee_name:
-                                calls.append(
-                                    {"caller": caller_name, "callee": callee_name}
-                                )
+        try:
+            collector = _PyCollector()
+            collector.visit(tree)
 
             return {
                 "file": path.name,
-                "functions": functions,
-                "classes": classes,
-                "imports": imports,
-                "calls": calls,
-                "loc": len(content.splitlines()),
+                "functions": collector.functions,
+                "classes": collector.classes,
+                "imports": collector.imports,
+                "calls": collector.calls,
+                "loc": loc,
             }
         except Exception as e:
             return {"error": str(e)}
@@ -259,61 +418,35 @@ class CodeParser:
             }
         return {}
 
-    def _parse_generic_regex(self, path: Path) -> Dict[str, Any]:
+    @_content_cached
+    def _parse_generic_regex(self, path: Path, data: bytes) -> Dict[str, Any]:
         """Simple regex based parser for C-like languages."""
 
         try:
-            with open(path, "r", encoding="utf-8", errors="replace") as f:
-                content = f.read()
+            content = data.decode("utf-8", errors="replace")
 
-            # Simple C-function regex: Type Name(Args) {
-            # Limiting to common C patterns to avoid false positives
-            # Improved regex to handle pointers and attributes better
-            func_pattern = re.compile(r"^\s*(?:[\w\*]+\s+)+(\w+)\s*\(", re.MULTILINE)
-            raw_functions = func_pattern.findall(content)
-
-            # Filter out control structures that look like function definitions (e.g. "else if")
-            # We allow 'main' because it's a critical entry point function
-            blacklist = {
-                "if",
-                "while",
-                "switch",
-                "for",
-                "catch",
-                "return",
-                "sizeof",
-                "else",
-                "define",
-            }
-            functions = [f for f in raw_functions if f not in blacklist]
+            raw_functions = _FUNC_RE.findall(content)
+            functions = [f for f in raw_functions if f not in _BLACKLIST]
 
             # Classes (for C++/Java)
-            class_pattern = re.compile(r"^\s*class\s+(\w+)", re.MULTILINE)
-            classes = class_pattern.findall(content)
+            classes = _CLASS_RE.findall(content)
 
             # Includes/Imports
-            imports = []
-            include_pattern = re.compile(r'#include\s+[<"](.+)[>"]')
-            imports.extend(include_pattern.findall(content))
+            imports = _INCLUDE_RE.findall(content)
 
             # Calls - this is hard with detailed scope parsing using just regex.
+            # One pass over the whole buffer: a function-definition line opens
+            # a new scope, every other call-like token is attributed to it.
             calls = []
             current_func = None
 
-            lines = content.splitlines()
-            for line in lines:
-                # Check for function start
-                func_match = func_pattern.search(line)
-                if func_match and "{" in line:  # Basic heuristics
-                    current_func = func_match.group(1)
-                    continue
-
-                if current_func:
-                    # Look for calls:  func_name(
-                    call_matches = re.findall(r"(\w+)\s*\(", line)
-                    for callee in call_matches:
-                        if callee not in blacklist and callee != current_func:
-                            calls.append({"caller": current_func, "callee": callee})
+            for m in _SCOPE_RE.finditer(content):
+                if m.lastgroup == "fdef":
+                    current_func = m.group("fname")
+                elif current_func:
+                    callee = m.group("cname")
+                    if callee not in _BLACKLIST and callee != current_func:
+                        calls.append({"caller": current_func, "callee": callee})
 
             return {
                 "file": path.name,
@@ -321,7 +454,8 @@ class CodeParser:
                 "classes": classes,
                 "imports": imports,
                 "calls": calls,
-                "loc": len(lines),
+                "loc": content.count("\n")
+                + (bool(content) and not content.endswith("\n")),
             }
         except Exception as e:
             return {"error": str(e)}
@@ -348,6 +348,14 @@ class CodeAnalyzer:
             self.session.log_progress("Auto-tagging architecture layers...")
             self.neo4j_adapter.auto_tag_layers(self.repo_path.name)
 
+        # Checkpoint file-backed graphs once the whole batch is stored
+        if self.neo4j_adapter and hasattr(self.neo4j_adapter, "flush"):
+            self.neo4j_adapter.flush()
+
+        # Everything is written: expire cached metrics analyses of this repo
+        if self.neo4j_adapter and hasattr(self.neo4j_adapter, "bump_repo_version"):
+            self.neo4j_adapter.bump_repo_version(self.repo_path.name)
+
         self.session.log_finding(
             "Analysis Complete", f"Successfully analyzed {processed_count} files."
         )
@@ -2,6 +2,7 @@
 Neo4j Adapter for Code Graph
 Handles efficient batch storage of code structure into Neo4j.
 """
+from contextlib import nullcontext
 from neo4j import GraphDatabase, Driver
 from typing import List, Dict, Any, Optional
 import logging
@@ -33,7 +34,12 @@ class Neo4jAdapter:
             "CREATE CONSTRAINT unique_file_path IF NOT EXISTS FOR (f:File) REQUIRE f.id IS UNIQUE",
             "CREATE CONSTRAINT unique_class_id IF NOT EXISTS FOR (c:Class) REQUIRE c.id IS UNIQUE",
             "CREATE CONSTRAINT unique_function_id IF NOT EXISTS FOR (f:Function) REQUIRE f.id IS UNIQUE",
+            "CREATE CONSTRAINT unique_repo_id IF NOT EXISTS FOR (r:Repo) REQUIRE r.id IS UNIQUE",
             "CREATE INDEX file_path_idx IF NOT EXISTS FOR (f:File) ON (f.path)",
+            # Repo-scoped queries (metrics, cycles) start from File {repo_id}
+            "CREATE INDEX file_repo_id_idx IF NOT EXISTS FOR (f:File) ON (f.repo_id)",
+            "CREATE INDEX file_repo_path_idx IF NOT EXISTS FOR (f:File) ON (f.repo_id, f.path)",
+            "CREATE INDEX function_name_idx IF NOT EXISTS FOR (f:Function) ON (f.name)",
         ]
 
         with self.driver.session() as session:
@@ -43,12 +49,16 @@ class Neo4jAdapter:
                 except Exception as e:
                     logger.warning(f"Schema init warning: {e}")
 
-    def detect_circular_dependencies(self, repo_id: str = None):
-        """Find circular function calls in the graph (excluding self-recursion)"""
+    def detect_circular_dependencies(self, repo_id: str = None, session=None):
+        """
+        Find circular function calls in the graph (excluding self-recursion).
+        Runs on `session` when the caller already holds one.
+        """
         if not self.driver:
             return []
 
-        with self.driver.session() as session:
+        own_session = session is None
+        with self.driver.session() if own_session else nullcontext(session) as session:
             if repo_id:
                 # Filter by repo_id if provided
                 # Use *2..5 (minimum 2 hops) to exclude self-loops (1-hop recursion)
@@ -474,6 +484,24 @@ class Neo4jAdapter:
             for q in queries:
                 session.run(q, {"repo_id": repo_id})
 
+    def bump_repo_version(self, repo_id: str):
+        """
+        Count one more finished write batch for the repository. The counter
+        is part of MetricsAnalyzer's cache key, so edge-only changes (call
+        linking, layer tagging) also expire cached analyses.
+        """
+        if not self.driver:
+            return
+
+        with self.driver.session() as session:
+            session.run(
+                """
+                MERGE (r:Repo {id: $repo_id})
+                SET r.graph_version = coalesce(r.graph_version, 0) + 1
+            """,
+                {"repo_id": repo_id},
+            )
+
     def link_unresolved_calls(self):
         """
         Second pass: Link CALLS relationships for cross-file calls.
@@ -114,14 +114,31 @@ class CodeGraph:
     edges: List[CodeEdge] = field(default_factory=list)
     imports_map: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
     call_graph: Dict[str, Set[str]] = field(default_factory=lambda: defaultdict(set))
+    # node_id -> edges leaving / entering it, so edge lookups skip the full scan
+    _edges_from: Dict[str, List[CodeEdge]] = field(
+        default_factory=lambda: defaultdict(list), repr=False, compare=False
+    )
+    _edges_to: Dict[str, List[CodeEdge]] = field(
+        default_factory=lambda: defaultdict(list), repr=False, compare=False
+    )
+    # element_type -> {node_id: node}, so per-type queries skip other nodes
+    _nodes_by_type: Dict[CodeElementType, Dict[str, CodeNode]] = field(
+        default_factory=lambda: defaultdict(dict), repr=False, compare=False
+    )
 
     def add_node(self, node: CodeNode) -> None:
         """Add a node to the graph."""
+        previous = self.nodes.get(node.id)
+        if previous is not None and previous.element_type != node.element_type:
+            del self._nodes_by_type[previous.element_type][node.id]
         self.nodes[node.id] = node
+        self._nodes_by_type[node.element_type][node.id] = node
 
     def add_edge(self, edge: CodeEdge) -> None:
         """Add an edge to the graph."""
         self.edges.append(edge)
+        self._edges_from[edge.source_id].append(edge)
+        self._edges_to[edge.target_id].append(edge)
         # Track relationships
         if edge.edge_type == EdgeType.CALLS:
             self.call_graph[edge.source_id].add(edge.target_id)
@@ -132,50 +149,36 @@ class CodeGraph:
         """Retrieve a node by ID."""
         return self.nodes.get(node_id)
 
+    def get_nodes_by_type(self, element_type: CodeElementType) -> List[CodeNode]:
+        """Get all nodes of one element type, in insertion order."""
+        return list(self._nodes_by_type.get(element_type, {}).values())
+
     def get_edges_from(
         self, node_id: str, edge_type: Optional[EdgeType] = None
     ) -> List[CodeEdge]:
         """Get all outgoing edges from a node."""
-        edges = [e for e in self.edges if e.source_id == node_id]
+        edges = self._edges_from.get(node_id, ())
         if edge_type:
-            edges = [e for e in edges if e.edge_type == edge_type]
-        return edges
+            return [e for e in edges if e.edge_type == edge_type]
+        return list(edges)
 
     def get_edges_to(
         self, node_id: str, edge_type: Optional[EdgeType] = None
     ) -> List[CodeEdge]:
         """Get all incoming edges to a node."""
-        edges = [e for e in self.edges if e.target_id == node_id]
+        edges = self._edges_to.get(node_id, ())
         if edge_type:
-            edges = [e for e in edges if e.edge_type == edge_type]
-        return edges
+            return [e for e in edges if e.edge_type == edge_type]
+        return list(edges)
 
     def get_stats(self) -> Dict:
         """Get graph statistics."""
         return {
             "node_count": len(self.nodes),
             "edge_count": len(self.edges),
-            "files": len(
-                [
-                    n
-                    for n in self.nodes.values()
-                    if n.element_type == CodeElementType.FILE
-                ]
-            ),
-            "classes": len(
-                [
-                    n
-                    for n in self.nodes.values()
-                    if n.element_type == CodeElementType.CLASS
-                ]
-            ),
-            "functions": len(
-                [
-                    n
-                    for n in self.nodes.values()
-                    if n.element_type == CodeElementType.FUNCTION
-                ]
-            ),
+            "files": len(self._nodes_by_type.get(CodeElementType.FILE, {})),
+            "classes": len(self._nodes_by_type.get(CodeElementType.CLASS, {})),
+            "functions": len(self._nodes_by_type.get(CodeElementType.FUNCTION, {})),
             "total_loc": sum(n.lines_of_code for n in self.nodes.values()),
         }
 
@@ -4,7 +4,7 @@ Refactored to use src/core/git_helper.py common logic
 """
 
 from pathlib import Path
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Iterator
 from pydantic import BaseModel, Field
 from tools.base import Tool
 from core.git_helper import GitHelper
@@ -70,6 +70,10 @@ class GitClient(Tool):
         """Get git repository status"""
         return self.helper.get_status()
 
+    def snapshot(self, count: int = 10) -> Dict[str, Any]:
+        """Get status, branch, commit, recent commits and remotes in one go."""
+        return self.helper.snapshot(count)
+
     def get_commits(self, count: int = 10) -> List[Dict[str, Any]]:
         """Get recent commits"""
         return self.helper.get_commits(count)
@@ -103,6 +107,12 @@ class GitClient(Tool):
         """Fetch and checkout a PR by number."""
         return self.helper.checkout_pr(pr_number, remote)
 
-    def get_diff(self, target: str = "HEAD") -> str:
+    def get_diff(self, target: str = "HEAD", paths: Optional[List[str]] = None) -> str:
         """Get diff of current changes or compare with target."""
-        return self.helper.get_diff(target)
+        return self.helper.get_diff(target, paths)
+
+    def iter_diff(
+        self, target: str = "HEAD", paths: Optional[List[str]] = None
+    ) -> Iterator[str]:
+        """Stream diff lines against target without buffering the whole diff."""
+        return self.helper.iter_diff(target, paths)
@@ -9,11 +9,46 @@ from git import Repo, Actor
 from datetime import datetime
 import requests
 import re
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from config.config import get_config
 from tools.base import Tool
 
 logger = logging.getLogger("agents")
 
+# Maps ASCII non-alphanumerics to "-" for branch slugs (non-ASCII passes through)
+_SLUG_TABLE = {i: (chr(i) if chr(i).isalnum() else "-") for i in range(128)}
+
+_GH_RE = re.compile(r"github\.com[:/]([^/]+)/([^/.]+)")
+
+_CRED_MGR = None
+_SESSION = None
+
+
+def _get_credential_manager():
+    """Return a process-wide CredentialManager (hosts.json is read once)."""
+    global _CRED_MGR
+    if _CRED_MGR is None:
+        from tools.forge.credential_manager import CredentialManager
+
+        _CRED_MGR = CredentialManager()
+    return _CRED_MGR
+
+
+def _get_session() -> requests.Session:
+    """Return a process-wide keep-alive session for GitHub API calls."""
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        # Retry only connection failures; PR creation (POST) isn't idempotent
+        adapter = HTTPAdapter(
+            pool_connections=4,
+            pool_maxsize=16,
+            max_retries=Retry(connect=3, read=0, backoff_factor=0.5),
+        )
+        _SESSION.mount("https://", adapter)
+    return _SESSION
+
 
 class GitOps(Tool):
     name = "git_ops"
@@ -27,6 +62,8 @@ class GitOps(Tool):
 
     def __init__(self, repo_path: str = "."):
         self.repo_path = repo_path
+        self._push_target = None
+        self._github_owner_repo = None
         try:
             self.repo = Repo(repo_path)
             self.actor = Actor("Yaver AI", "agent@yaver.ai")
@@ -40,7 +77,7 @@ class GitOps(Tool):
             return None
 
         # Sanitize branch name
-        slug = "".join(c if c.isalnum() else "-" for c in task_name.lower())[:30]
+        slug = task_name.lower().translate(_SLUG_TABLE)[:30]
         timestamp = datetime.now().strftime("%Y%m%d%H%M")
         branch_name = f"yaver/feature/{slug}-{timestamp}"
 
@@ -66,39 +103,50 @@ class GitOps(Tool):
         except Exception as e:
             logger.error(f"Git commit error: {e}")
 
+    def _resolve_push_target(self):
+        """
+        Resolve the origin remote and (optionally) a token-authenticated push URL.
+        The result is constant per repo, so it is computed once and cached.
+        """
+        if self._push_target is not None:
+            return self._push_target
+
+        # 1. Get raw remote URL
+        origin = self.repo.remote(name="origin")
+        remote_url = origin.url
+
+        # 2. Check for Token via CredentialManager
+        auth_url = None
+        try:
+            creds = _get_credential_manager()
+            host = creds.detect_host_from_url(remote_url)
+
+            if host and remote_url.startswith("https://"):
+                config = creds.get_host_config(host)
+                if config and config.token:
+                    # Construct URL: https://<TOKEN>@domain/owner/repo.git
+                    # Note: remote_url is like https://domain/owner/repo.git
+                    # We strip https:// and prepend https://token@
+                    clean_url = remote_url.replace("https://", "", 1)
+                    auth_url = f"https://{config.token}@{clean_url}"
+                    logger.info(f"Using authenticated push for host: {host}")
+        except ImportError:
+            pass
+        except Exception as e:
+            logger.warning(f"Credential lookup failed: {e}")
+
+        self._push_target = (origin, auth_url)
+        return self._push_target
+
     def push_changes(self, branch_name: str) -> bool:
         """Pushes the branch to remote, injecting token if available for HTTPS."""
         if not self.repo:
             return False
 
         try:
-            # 1. Get raw remote URL
-            origin = self.repo.remote(name="origin")
-            remote_url = origin.url
-
-            # 2. Check for Token via CredentialManager
-            auth_url = None
-            try:
-                from tools.forge.credential_manager import CredentialManager
-
-                creds = CredentialManager()
-                host = creds.detect_host_from_url(remote_url)
-
-                if host and remote_url.startswith("https://"):
-                    config = creds.get_host_config(host)
-                    if config and config.token:
-                        # Construct URL: https://<TOKEN>@domain/owner/repo.git
-                        # Note: remote_url is like https://domain/owner/repo.git
-                        # We strip https:// and prepend https://token@
-                        clean_url = remote_url.replace("https://", "", 1)
-                        auth_url = f"https://{config.token}@{clean_url}"
-                        logger.info(f"Using authenticated push for host: {host}")
-            except ImportError:
-                pass
-            except Exception as e:
-                logger.warning(f"Credential lookup failed: {e}")
-
-            # 3. Push
+            origin, auth_url = self._resolve_push_target()
+
+            # 3. Push (target resolved once per repo)
             if auth_url:
                 # Use git command directly for custom URL push
                 self.repo.git.push(auth_url, branch_name)
@@ -112,6 +160,21 @@ class GitOps(Tool):
             logger.error(f"Git push error: {e}")
             return False
 
+    def _github_repo(self):
+        """Parse (owner, repo) from the origin URL once and cache it."""
+        if self._github_owner_repo is None:
+            remote_url = self.repo.remotes.origin.url
+            # Parse owner/repo from https://github.com/owner/repo.git or git@github.com:owner/repo.git
+            match = _GH_RE.search(remote_url)
+            if not match:
+                logger.error(f"Could not parse GitHub repo from {remote_url}")
+                return None
+
+            owner, repo = match.groups()
+            repo = repo.replace(".git", "")  # Cleanup
+            self._github_owner_repo = (owner, repo)
+        return self._github_owner_repo
+
     def create_pull_request(
         self, branch_name: str, title: str, body: str, base: str = "main"
     ) -> str:
@@ -125,15 +188,10 @@ class GitOps(Tool):
 
         # Get owner/repo from remote URL
         try:
-            remote_url = self.repo.remotes.origin.url
-            # Parse owner/repo from https://github.com/owner/repo.git or git@github.com:owner/repo.git
-            match = re.search(r"github\.com[:/]([^/]+)/([^/.]+)", remote_url)
-            if not match:
-                logger.error(f"Could not parse GitHub repo from {remote_url}")
+            github_repo = self._github_repo()
+            if not github_repo:
                 return None
-
-            owner, repo = match.groups()
-            repo = repo.replace(".git", "")  # Cleanup
+            owner, repo = github_repo
 
             url = f"https://api.github.com/repos/{owner}/{repo}/pulls"
             headers = {
@@ -142,7 +200,7 @@ class GitOps(Tool):
             }
             data = {"title": title, "body": body, "head": branch_name, "base": base}
 
-            resp = requests.post(url, json=data, headers=headers)
+            resp = _get_session().post(url, json=data, headers=headers, timeout=30)
             resp.raise_for_status()
             pr_data = resp.json()
             pr_url = pr_data.get("html_url", "unknown")
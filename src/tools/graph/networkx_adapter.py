@@ -3,19 +3,224 @@ NetworkX Graph Database Adapter
 Pure Python, zero-dependency alternative to Neo4j
 """
 
+import os
+import sys
+import math
+import heapq
 import pickle
+import struct
 import logging
+from collections import Counter, OrderedDict, defaultdict
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterator, Optional
 import networkx as nx
 
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
+# Journal records are a 4-byte big-endian length followed by (op, payload),
+# encoded as a JSON array when orjson round-trips it exactly, pickled otherwise
+_RECORD_HEADER = struct.Struct(">I")
+_IO_BUFFER_SIZE = 1 << 20
+# Snapshots written as msgpack tables start with this tag; anything else is a pickle
+_MSGPACK_MAGIC = b"YVGRAPH1"
+# msgpack ext code for tuples, which would otherwise load back as lists
+_MSGPACK_TUPLE = 1
+_LOAD_CHUNK_SIZE = 10_000
+# The journal is folded into a new snapshot once it outgrows both this and the
+# snapshot itself, which bounds replay time while keeping compaction amortised
+_CHECKPOINT_MIN_BYTES = 64 << 20
+CONTEXT_CACHE_SIZE = 1024
+
+# direction -> neighbor iterator over a DiGraph
+_NEIGHBOR_ITERS = {
+    "out": nx.DiGraph.successors,
+    "in": nx.DiGraph.predecessors,
+    "both": lambda graph, node_id: chain(
+        graph.predecessors(node_id), graph.successors(node_id)
+    ),
+}
+
+# One shared tuple per distinct label combination
+_LABEL_CACHE: Dict[tuple, tuple] = {}
+# Properties whose string values repeat across most nodes of a repository
+_SHARED_VALUE_KEYS = frozenset(
+    {"language", "repo_name", "repo_id", "file_path", "session_id", "commit_hash"}
+)
+
+
+def _json_exact(value: Any) -> bool:
+    """
+    True if orjson gives value back unchanged: JSON-native types only. It
+    would also encode datetimes, UUIDs, enums, dataclasses and tuples, but
+    they replay as str / dict / list.
+    """
+    kind = type(value)
+    if value is None or kind is str or kind is bool or kind is int:
+        return True
+    if kind is float:
+        # NaN and infinities are written as null
+        return math.isfinite(value)
+    if kind is list:
+        return all(map(_json_exact, value))
+    if kind is dict:
+        return all(
+            type(key) is str and _json_exact(item) for key, item in value.items()
+        )
+    return False
+
+
+def _payload_json_exact(op: str, payload: Any) -> bool:
+    """
+    True if every id, label and property in a journal payload survives
+    orjson. The records themselves may be tuples (replay unpacks them
+    positionally), and so may label sequences (add_node interns them).
+    """
+    if op == "add_node" or op == "add_nodes":
+        records = (payload,) if op == "add_node" else payload
+        return all(
+            _json_exact(node_id)
+            and _json_exact(list(labels or ()))
+            and _json_exact(properties)
+            for node_id, labels, properties in records
+        )
+    if op == "set_props" or op == "add_rel":
+        return all(map(_json_exact, payload))
+    if op == "add_rels":
+        return all(all(map(_json_exact, edge)) for edge in payload)
+    return _json_exact(payload)
+
+
+def _encode_record(op: str, payload: Any) -> bytes:
+    """Serialize a journal record, preferring orjson over pickle"""
+    if orjson is not None and _payload_json_exact(op, payload):
+        try:
+            return orjson.dumps((op, payload))
+        except TypeError:
+            # Integers beyond 64 bits
+            pass
+    return pickle.dumps((op, payload), protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _decode_record(record: bytes) -> tuple:
+    """Inverse of _encode_record (pickles never start with '[')"""
+    if record[:1] == b"[":
+        if orjson is None:
+            raise RuntimeError("orjson is required to replay this graph journal")
+        return tuple(orjson.loads(record))
+    return pickle.loads(record)
+
+
+def _msgpack_default(obj: Any):
+    """
+    Pack tuples as an ext type. Snapshots are packed with strict_types, so
+    anything else landing here (sets, datetimes, str/int subclasses such as
+    enums) raises and the snapshot falls back to pickle.
+    """
+    if type(obj) is tuple:
+        return msgpack.ExtType(
+            _MSGPACK_TUPLE,
+            msgpack.packb(
+                list(obj),
+                use_bin_type=True,
+                strict_types=True,
+                default=_msgpack_default,
+            ),
+        )
+    raise TypeError(f"no msgpack encoding for {type(obj).__name__}")
+
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    """Inverse of _msgpack_default"""
+    if code == _MSGPACK_TUPLE:
+        return tuple(
+            msgpack.unpackb(
+                data, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+            )
+        )
+    return msgpack.ExtType(code, data)
+
+
+def _index_value(index: Dict[Any, Dict[str, None]], value: Any, node_id: str):
+    """Add node_id under value; None and unhashable values are not indexed"""
+    if value is None:
+        return
+    try:
+        index.setdefault(value, {})[node_id] = None
+    except TypeError:
+        pass
+
+
+def _has_set_buckets(*indexes: Dict[Any, Any]) -> bool:
+    """Whether loaded indexes hold set buckets (snapshots before ordered ids)"""
+    for index in indexes:
+        for ids in index.values():
+            return isinstance(ids, set)
+    return False
+
+
+def _unindex_value(index: Dict[Any, Dict[str, None]], value: Any, node_id: str):
+    """Inverse of _index_value"""
+    if value is None:
+        return
+    try:
+        ids = index.get(value)
+    except TypeError:
+        return
+    if ids is not None:
+        ids.pop(node_id, None)
+        if not ids:
+            del index[value]
+
+
+def _fsync_dir(path: Path):
+    """Make a rename inside a directory durable (no-op where unsupported)"""
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _intern_labels(labels) -> tuple:
+    """Return the shared tuple for a label combination"""
+    key = tuple(labels)
+    return _LABEL_CACHE.setdefault(key, key)
+
+
+def _intern_properties(properties: Dict[str, Any]) -> Dict[str, Any]:
+    """Intern property keys and the string values of repetitive properties"""
+    interned = {}
+    for key, value in properties.items():
+        key = sys.intern(key)
+        if key in _SHARED_VALUE_KEYS and type(value) is str:
+            value = sys.intern(value)
+        interned[key] = value
+    return interned
+
 
 class NetworkXAdapter:
     """
     NetworkX-based graph database adapter
     Provides Neo4j-like interface with local file persistence
+
+    Mutations are journaled as they happen; call flush() (or close()) after a
+    batch to fold them into the snapshot.
     """
 
     def __init__(self, persist_path: str = "~/.yaver/graph.pkl"):
@@ -27,6 +232,25 @@ class NetworkXAdapter:
         """
         self.persist_path = Path(persist_path).expanduser()
         self.graph = nx.DiGraph()
+        # Secondary indexes: name -> node ids, label -> node ids. The ids sit
+        # in dicts used as insertion-ordered sets, so lookups return nodes in
+        # the order they were added, as a scan of the graph would
+        self._name_index: Dict[str, Dict[str, None]] = {}
+        self._label_index: Dict[str, Dict[str, None]] = {}
+        # property key -> value -> node ids, created for a key the first time
+        # find_nodes filters on it and maintained from then on (not persisted)
+        self._prop_index: Dict[str, Dict[Any, Dict[str, None]]] = {}
+        # Bumped on every change; keys the stats and context caches
+        self._mut_version = 0
+        self._stats_cache = (-1, None)
+        self._context_cache: "OrderedDict[tuple, str]" = OrderedDict()
+        self._context_version = -1
+        # Mutations are appended here and folded into the snapshot by compact()
+        self.journal_path = self.persist_path.with_suffix(".log")
+        self._journal = None
+        self._journal_bytes = 0
+        self._snapshot_bytes = 0
+        self._replaying = False
         self.load()
         logger.info(f"NetworkX adapter initialized: {self.persist_path}")
 
@@ -39,8 +263,97 @@ class NetworkXAdapter:
             labels: Node labels (e.g., ['File', 'Python'])
             **properties: Node properties
         """
-        labels = labels or []
+        labels = _intern_labels(labels or ())
+        properties = _intern_properties(properties)
+        if node_id in self.graph:
+            self._unindex_node(node_id)
         self.graph.add_node(node_id, labels=labels, **properties)
+        self._index_node(node_id)
+        self._mut_version += 1
+        self._journal_op("add_node", (node_id, labels, properties))
+
+    def add_nodes(self, nodes: List[tuple]):
+        """
+        Add many nodes at once
+
+        Args:
+            nodes: (node_id, labels, properties) tuples
+        """
+        if not nodes:
+            return
+        # Merge repeated ids the way successive add_node calls would
+        pending: Dict[str, Dict[str, Any]] = {}
+        for node_id, labels, properties in nodes:
+            attrs = _intern_properties(properties)
+            attrs["labels"] = _intern_labels(labels or ())
+            if node_id in pending:
+                pending[node_id].update(attrs)
+            else:
+                pending[node_id] = attrs
+
+        for node_id in pending:
+            if node_id in self.graph:
+                self._unindex_node(node_id)
+        self.graph.add_nodes_from(pending.items())
+        for node_id in pending:
+            self._index_node(node_id)
+        self._mut_version += 1
+        self._journal_op("add_nodes", nodes)
+
+    def _set_node_properties(self, node_id: str, **properties):
+        """Update properties of an existing node without touching its labels"""
+        self._unindex_node(node_id)
+        self.graph.nodes[node_id].update(properties)
+        self._index_node(node_id)
+        self._mut_version += 1
+        self._journal_op("set_props", (node_id, properties))
+
+    def _index_node(self, node_id: str):
+        """Register a node in the name, label and property indexes"""
+        data = self.graph.nodes[node_id]
+        name = data.get("name")
+        if name is not None:
+            self._name_index.setdefault(name, {})[node_id] = None
+        for label in data.get("labels", []):
+            self._label_index.setdefault(label, {})[node_id] = None
+        for key, index in self._prop_index.items():
+            _index_value(index, data.get(key), node_id)
+
+    def _unindex_node(self, node_id: str):
+        """Drop a node from the name, label and property indexes"""
+        data = self.graph.nodes[node_id]
+        name = data.get("name")
+        ids = self._name_index.get(name)
+        if ids is not None:
+            ids.pop(node_id, None)
+            if not ids:
+                del self._name_index[name]
+        for label in data.get("labels", []):
+            ids = self._label_index.get(label)
+            if ids is not None:
+                ids.pop(node_id, None)
+                if not ids:
+                    del self._label_index[label]
+        for key, index in self._prop_index.items():
+            _unindex_value(index, data.get(key), node_id)
+
+    def _rebuild_indexes(self):
+        """Rebuild the name and label indexes from the graph"""
+        self._name_index = {}
+        self._label_index = {}
+        self._prop_index = {}
+        for node_id in self.graph.nodes:
+            self._index_node(node_id)
+
+    def _property_index(self, key: str) -> Dict[Any, Dict[str, None]]:
+        """Get (building on first use) the value -> node ids index for a property"""
+        index = self._prop_index.get(key)
+        if index is None:
+            index = {}
+            for node_id, data in self.graph.nodes(data=True):
+                _index_value(index, data.get(key), node_id)
+            self._prop_index[key] = index
+        return index
 
     def add_relationship(
         self, from_node: str, to_node: str, rel_type: str, **properties
@@ -55,6 +368,22 @@ class NetworkXAdapter:
             **properties: Relationship properties
         """
         self.graph.add_edge(from_node, to_node, type=rel_type, **properties)
+        self._mut_version += 1
+        self._journal_op("add_rel", (from_node, to_node, rel_type, properties))
+
+    def add_relationships(self, edges: List[tuple]):
+        """
+        Add many relationships at once
+
+        Args:
+            edges: (from_node, to_node, properties) tuples; properties must
+                include the relationship 'type'
+        """
+        if not edges:
+            return
+        self.graph.add_edges_from(edges)
+        self._mut_version += 1
+        self._journal_op("add_rels", edges)
 
     def find_nodes(self, label: str = None, **filters) -> List[Dict[str, Any]]:
         """
@@ -67,20 +396,44 @@ class NetworkXAdapter:
         Returns:
             List of matching nodes with their properties
         """
-        results = []
-        for node_id, data in self.graph.nodes(data=True):
-            # Check label
-            if label and label not in data.get("labels", []):
+        # Narrow candidates through the indexes before checking properties:
+        # every filter with an indexable value contributes a candidate set
+        # and the smallest sets are intersected first
+        nodes = self.graph.nodes
+        candidate_sets = []
+        if label:
+            candidate_sets.append(self._label_index.get(label, {}))
+        for key, value in filters.items():
+            if value is None:
+                continue
+            try:
+                hash(value)
+            except TypeError:
                 continue
+            index = self._name_index if key == "name" else self._property_index(key)
+            candidate_sets.append(index.get(value, {}))
+
+        if candidate_sets:
+            candidate_sets.sort(key=len)
+            # Walk the smallest set in its insertion order, probing the rest,
+            # so results keep a stable order
+            smallest, others = candidate_sets[0], candidate_sets[1:]
+            candidates = (
+                (node_id, nodes[node_id])
+                for node_id in smallest
+                if all(node_id in ids for ids in others)
+            )
+        else:
+            candidates = nodes(data=True)
 
+        filter_items = list(filters.items())
+        results = []
+        for node_id, data in candidates:
             # Check filters
-            match = True
-            for key, value in filters.items():
+            for key, value in filter_items:
                 if data.get(key) != value:
-                    match = False
                     break
-
-            if match:
+            else:
                 results.append({"id": node_id, **data})
 
         return results
@@ -99,13 +452,30 @@ class NetworkXAdapter:
         Returns:
             List of matching relationships
         """
+        # Walk only the adjacency of a fixed endpoint instead of every edge
+        if from_node:
+            if from_node not in self.graph:
+                return []
+            out_edges = self.graph.adj[from_node]
+            if to_node:
+                data = out_edges.get(to_node)
+                edges = [] if data is None else [(from_node, to_node, data)]
+            else:
+                edges = (
+                    (from_node, target, data) for target, data in out_edges.items()
+                )
+        elif to_node:
+            if to_node not in self.graph:
+                return []
+            edges = (
+                (source, to_node, data)
+                for source, data in self.graph.pred[to_node].items()
+            )
+        else:
+            edges = self.graph.edges(data=True)
+
         results = []
-        for source, target, data in self.graph.edges(data=True):
-            # Apply filters
-            if from_node and source != from_node:
-                continue
-            if to_node and target != to_node:
-                continue
+        for source, target, data in edges:
             if rel_type and data.get("type") != rel_type:
                 continue
 
@@ -123,11 +493,19 @@ class NetworkXAdapter:
     def delete_node(self, node_id: str):
         """Delete a node and its relationships"""
         if node_id in self.graph:
+            self._unindex_node(node_id)
             self.graph.remove_node(node_id)
+            self._mut_version += 1
+            self._journal_op("delete_node", node_id)
 
     def delete_all(self):
         """Delete all nodes and relationships"""
         self.graph.clear()
+        self._name_index.clear()
+        self._label_index.clear()
+        self._prop_index.clear()
+        self._mut_version += 1
+        self._journal_op("delete_all", None)
         logger.info("Cleared all graph data")
 
     def get_neighbors(self, node_id: str, direction: str = "out") -> List[str]:
@@ -141,69 +519,319 @@ class NetworkXAdapter:
         Returns:
             List of neighbor node IDs
         """
-        if node_id not in self.graph:
+        # Read the adjacency dicts directly (G._succ[n] is what successors(n)
+        # wraps in an iterator)
+        succ = self.graph._succ.get(node_id)
+        if succ is None:
             return []
-
         if direction == "out":
-            return list(self.graph.successors(node_id))
-        elif direction == "in":
-            return list(self.graph.predecessors(node_id))
-        elif direction == "both":
-            return list(self.graph.predecessors(node_id)) + list(
-                self.graph.successors(node_id)
-            )
-        else:
+            return list(succ)
+        if direction == "in":
+            return list(self.graph._pred[node_id])
+        if direction == "both":
+            return [*self.graph._pred[node_id], *succ]
+        raise ValueError(f"Invalid direction: {direction}")
+
+    def iter_neighbors(self, node_id: str, direction: str = "out") -> Iterator[str]:
+        """Iterate neighboring node IDs without building a list (see get_neighbors)"""
+        neighbors = _NEIGHBOR_ITERS.get(direction)
+        if neighbors is None:
             raise ValueError(f"Invalid direction: {direction}")
+        if node_id not in self.graph:
+            return iter(())
+        return neighbors(self.graph, node_id)
 
     def find_nodes_by_name(self, name: str) -> List[Dict[str, Any]]:
         """
         Find nodes by 'name' property (exact match).
         Useful for resolving function names to node IDs.
         """
-        results = []
-        for node_id, data in self.graph.nodes(data=True):
-            if data.get("name") == name:
-                results.append({"id": node_id, **data})
-        return results
+        nodes = self.graph.nodes
+        return [
+            {"id": node_id, **nodes[node_id]}
+            for node_id in self._name_index.get(name, ())
+        ]
 
     def get_stats(self) -> Dict[str, int]:
         """Get graph statistics"""
-        return {
-            "nodes": self.graph.number_of_nodes(),
-            "edges": self.graph.number_of_edges(),
-            "density": nx.density(self.graph),
-        }
+        version, stats = self._stats_cache
+        if version != self._mut_version:
+            n = self.graph.number_of_nodes()
+            m = self.graph.number_of_edges()
+            # nx.density for a DiGraph, without its argument checks
+            stats = {
+                "nodes": n,
+                "edges": m,
+                "density": m / (n * (n - 1)) if n > 1 else 0.0,
+            }
+            self._stats_cache = (self._mut_version, stats)
+        return dict(stats)
+
+    def count_edges_by_type(self) -> Dict[str, int]:
+        """Count relationships per type"""
+        return dict(Counter(t for _, _, t in self.graph.edges(data="type")))
+
+    def _journal_op(self, op: str, payload: Any):
+        """Append a mutation record to the journal"""
+        if self._replaying:
+            return
+        try:
+            if self._journal is None:
+                self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+                self._journal = open(self.journal_path, "ab")
+            record = _encode_record(op, payload)
+            # Two writes into the file buffer rather than concatenating a copy
+            journal = self._journal
+            journal.write(_RECORD_HEADER.pack(len(record)))
+            journal.write(record)
+            journal.flush()
+            self._journal_bytes += _RECORD_HEADER.size + len(record)
+        except Exception as e:
+            logger.error(f"Failed to journal graph mutation: {e}")
+            return
 
-    def save(self):
-        """Persist graph to disk"""
+        if self._journal_bytes > max(_CHECKPOINT_MIN_BYTES, self._snapshot_bytes):
+            self.compact()
+
+    def _replay_journal(self) -> int:
+        """Apply journaled mutations on top of the loaded snapshot"""
+        if not self.journal_path.exists():
+            return 0
+
+        applied = 0
+        self._replaying = True
+        try:
+            with open(self.journal_path, "rb", buffering=_IO_BUFFER_SIZE) as f:
+                while True:
+                    header = f.read(_RECORD_HEADER.size)
+                    if len(header) < _RECORD_HEADER.size:
+                        break
+                    (size,) = _RECORD_HEADER.unpack(header)
+                    record = f.read(size)
+                    if len(record) < size:
+                        # Torn write at the tail, everything before it is intact
+                        logger.warning("Ignoring truncated graph journal record")
+                        break
+                    op, payload = _decode_record(record)
+                    if op == "add_node":
+                        node_id, labels, properties = payload
+                        self.add_node(node_id, labels=labels, **properties)
+                    elif op == "set_props":
+                        node_id, properties = payload
+                        self._set_node_properties(node_id, **properties)
+                    elif op == "add_rel":
+                        from_node, to_node, rel_type, properties = payload
+                        self.add_relationship(
+                            from_node, to_node, rel_type, **properties
+                        )
+                    elif op == "add_nodes":
+                        self.add_nodes(payload)
+                    elif op == "add_rels":
+                        self.add_relationships(payload)
+                    elif op == "delete_node":
+                        self.delete_node(payload)
+                    elif op == "delete_all":
+                        self.delete_all()
+                    applied += 1
+        finally:
+            self._replaying = False
+        return applied
+
+    def compact(self):
+        """Write a full snapshot and truncate the journal"""
         try:
             self.persist_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.persist_path, "wb") as f:
-                pickle.dump(self.graph, f)
+            tmp_path = self.persist_path.with_suffix(".tmp")
+            written = False
+            if msgpack is not None:
+                try:
+                    self.save_msgpack(tmp_path)
+                    written = True
+                except (TypeError, ValueError, OverflowError) as e:
+                    # Some property value has no msgpack encoding
+                    logger.debug(f"msgpack snapshot unavailable, using pickle: {e}")
+            if not written:
+                with open(tmp_path, "wb", buffering=_IO_BUFFER_SIZE) as f:
+                    pickle.dump(
+                        (self.graph, self._name_index, self._label_index),
+                        f,
+                        protocol=pickle.HIGHEST_PROTOCOL,
+                    )
+                    f.flush()
+                    os.fsync(f.fileno())
+            # The snapshot must be on disk before the journal it replaces goes
+            os.replace(tmp_path, self.persist_path)
+            _fsync_dir(self.persist_path.parent)
+            self._snapshot_bytes = self.persist_path.stat().st_size
+
+            if self._journal is not None:
+                self._journal.close()
+                self._journal = None
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._journal_bytes = 0
             logger.info(f"Saved graph to {self.persist_path}")
         except Exception as e:
             logger.error(f"Failed to save graph: {e}")
 
+    def save_msgpack(self, path: Path):
+        """
+        Write the graph as msgpack node and edge tables.
+
+        Layout: magic tag, a header map with the table sizes, one
+        [node_id, properties] record per node, then one
+        [source, target, properties] record per edge.
+        """
+        packer = msgpack.Packer(
+            use_bin_type=True, strict_types=True, default=_msgpack_default
+        )
+        with open(path, "wb", buffering=_IO_BUFFER_SIZE) as f:
+            f.write(_MSGPACK_MAGIC)
+            f.write(
+                packer.pack(
+                    {
+                        "nodes": self.graph.number_of_nodes(),
+                        "edges": self.graph.number_of_edges(),
+                    }
+                )
+            )
+            for node_id, data in self.graph.nodes(data=True):
+                f.write(packer.pack([node_id, data]))
+            for source, target, data in self.graph.edges(data=True):
+                f.write(packer.pack([source, target, data]))
+            f.flush()
+            os.fsync(f.fileno())
+
+    def load_msgpack(self, f):
+        """Read msgpack node and edge tables (positioned after the magic tag)"""
+        unpacker = msgpack.Unpacker(
+            f, raw=False, strict_map_key=False, ext_hook=_msgpack_ext_hook
+        )
+        header = unpacker.unpack()
+        graph = nx.DiGraph()
+
+        def node_record():
+            node_id, data = unpacker.unpack()
+            data = _intern_properties(data)
+            data["labels"] = _intern_labels(data.get("labels", ()))
+            return node_id, data
+
+        def edge_record():
+            return tuple(unpacker.unpack())
+
+        for add, read, count in (
+            (graph.add_nodes_from, node_record, header["nodes"]),
+            (graph.add_edges_from, edge_record, header["edges"]),
+        ):
+            while count:
+                chunk = min(count, _LOAD_CHUNK_SIZE)
+                add([read() for _ in range(chunk)])
+                count -= chunk
+
+        self.graph = graph
+        self._rebuild_indexes()
+
+    def get_label_counts(self) -> Dict[str, int]:
+        """Get node counts per label (read off the label index)"""
+        return {label: len(ids) for label, ids in self._label_index.items()}
+
+    def get_hubs(self, repo_name: str, limit: int = 5) -> List[Dict[str, Any]]:
+        """
+        Most connected nodes of a repository (in + out degree), for the
+        'Structural Hubs' insight. Degrees come straight off the adjacency
+        dicts, so nothing needs precomputing.
+        """
+        nodes = self.graph.nodes
+        succ = self.graph._succ
+        pred = self.graph._pred
+        degrees = (
+            (len(succ[node_id]) + len(pred[node_id]), node_id)
+            for node_id in self._property_index("repo_name").get(repo_name, ())
+        )
+        hubs = []
+        for degree, node_id in heapq.nlargest(limit, degrees):
+            if not degree:
+                break
+            data = nodes[node_id]
+            labels = data.get("labels", ())
+            hubs.append(
+                {
+                    "file": data.get("path") or data.get("file_path"),
+                    "symbol": data.get("name"),
+                    "type": labels[0] if labels else None,
+                    "degree": degree,
+                }
+            )
+        return hubs
+
+    def save(self):
+        """Persist graph to disk"""
+        self.compact()
+
+    def flush(self):
+        """
+        Checkpoint the graph at the end of a batch.
+
+        The store_* and link methods only append to the journal, so bulk
+        loaders should ingest everything first and call flush() once.
+        """
+        self.save()
+
     def load(self):
-        """Load graph from disk"""
+        """Load graph snapshot from disk and replay the journal"""
         if self.persist_path.exists():
             try:
-                with open(self.persist_path, "rb") as f:
-                    self.graph = pickle.load(f)
-                logger.info(
-                    f"Loaded graph from {self.persist_path}: "
-                    f"{self.graph.number_of_nodes()} nodes, "
-                    f"{self.graph.number_of_edges()} edges"
-                )
+                with open(self.persist_path, "rb", buffering=_IO_BUFFER_SIZE) as f:
+                    if f.read(len(_MSGPACK_MAGIC)) == _MSGPACK_MAGIC:
+                        if msgpack is None:
+                            raise RuntimeError("msgpack is required to read this graph")
+                        self.load_msgpack(f)
+                        payload = None
+                    else:
+                        f.seek(0)
+                        payload = pickle.load(f)
+                if isinstance(payload, tuple):
+                    self.graph, self._name_index, self._label_index = payload
+                    self._prop_index = {}
+                    if _has_set_buckets(self._name_index, self._label_index):
+                        # Older snapshots kept unordered sets
+                        self._rebuild_indexes()
+                elif payload is not None:
+                    # Older files hold a bare graph without indexes
+                    self.graph = payload
+                    self._rebuild_indexes()
             except Exception as e:
                 logger.error(f"Failed to load graph: {e}")
                 self.graph = nx.DiGraph()
-        else:
+                self._name_index = {}
+                self._label_index = {}
+                self._prop_index = {}
+        elif not self.journal_path.exists():
             logger.info("No existing graph found, starting fresh")
+            return
+
+        self._mut_version += 1
+        try:
+            replayed = self._replay_journal()
+        except Exception as e:
+            logger.error(f"Failed to replay graph journal: {e}")
+            replayed = 0
+
+        if self.persist_path.exists():
+            self._snapshot_bytes = self.persist_path.stat().st_size
+        if self.journal_path.exists():
+            self._journal_bytes = self.journal_path.stat().st_size
+
+        logger.info(
+            f"Loaded graph from {self.persist_path}: "
+            f"{self.graph.number_of_nodes()} nodes, "
+            f"{self.graph.number_of_edges()} edges "
+            f"({replayed} journaled changes)"
+        )
 
     def close(self):
         """Close connection and save"""
-        self.save()
+        self.compact()
 
     def __enter__(self):
         return self
@@ -226,7 +854,29 @@ class NetworkXAdapter:
             language=language,
             loc=loc,
         )
-        self.save()
+
+    def store_file_nodes(self, files: List[Dict[str, Any]], repo_name: str):
+        """
+        Store many file nodes in one batch (AgentGraph Interface)
+
+        Args:
+            files: Dicts with file_path, language and loc
+        """
+        self.add_nodes(
+            [
+                (
+                    f"{repo_name}:{file['file_path']}",
+                    ["File"],
+                    {
+                        "path": file["file_path"],
+                        "repo_name": repo_name,
+                        "language": file["language"],
+                        "loc": file["loc"],
+                    },
+                )
+                for file in files
+            ]
+        )
 
     def store_code_structure(
         self, file_path: str, repo_name: str, structure: Dict[str, Any]
@@ -242,29 +892,43 @@ class NetworkXAdapter:
             # Should have been created by store_file_node, but ensure safe
             self.store_file_node(file_path, repo_name, "unknown", 0)
 
+        edges = []
+
         # 1. Classes
+        nodes = []
         for class_name in structure.get("classes", []):
             class_id = f"{file_id}::{class_name}"
-            self.add_node(
-                class_id,
-                labels=["Class"],
-                name=class_name,
-                file_path=file_path,
-                repo_name=repo_name,
+            nodes.append(
+                (
+                    class_id,
+                    ["Class"],
+                    {
+                        "name": class_name,
+                        "file_path": file_path,
+                        "repo_name": repo_name,
+                    },
+                )
             )
-            self.add_relationship(file_id, class_id, "CONTAINS")
+            edges.append((file_id, class_id, {"type": "CONTAINS"}))
 
         # 2. Functions
         for func_name in structure.get("functions", []):
             func_id = f"{file_id}::{func_name}"
-            self.add_node(
-                func_id,
-                labels=["Function"],
-                name=func_name,
-                file_path=file_path,
-                repo_name=repo_name,
+            nodes.append(
+                (
+                    func_id,
+                    ["Function"],
+                    {
+                        "name": func_name,
+                        "file_path": file_path,
+                        "repo_name": repo_name,
+                    },
+                )
             )
-            self.add_relationship(file_id, func_id, "CONTAINS")
+            edges.append((file_id, func_id, {"type": "CONTAINS"}))
+
+        # Nodes must exist before calls are matched against them below
+        self.add_nodes(nodes)
 
         # 3. Imports (Node-to-File linking is hard without resolving paths, storing as property for now)
         imports = structure.get("imports", [])
@@ -272,7 +936,7 @@ class NetworkXAdapter:
             # We can create "Import" nodes or just edges if we can resolve them.
             # For now, let's store them as property on the file node
             if file_id in self.graph.nodes:
-                self.graph.nodes[file_id]["imports"] = imports
+                self._set_node_properties(file_id, imports=imports)
             else:
                 logger.warning(f"File node {file_id} not found when storing imports")
 
@@ -286,6 +950,8 @@ class NetworkXAdapter:
 
         # 4. Calls
         calls = structure.get("calls", [])
+        external_calls = defaultdict(list)
+        nodes_map = self._nodes_map()
         for call in calls:
             caller = call.get("caller")
             callee = call.get("callee")
@@ -296,20 +962,22 @@ class NetworkXAdapter:
                 caller_id = f"{file_id}::{caller}"
 
                 # Check if caller exists
-                if self.graph.has_node(caller_id):
+                if caller_id in nodes_map:
                     # We can't easily resolve callee to a specific node ID without global symbol table.
                     # But we can store an "Unresolved Call" edge or property.
                     # Or try to find if callee exists in current file
                     callee_id_local = f"{file_id}::{callee}"
-                    if self.graph.has_node(callee_id_local):
-                        self.add_relationship(caller_id, callee_id_local, "CALLS")
+                    if callee_id_local in nodes_map:
+                        edges.append((caller_id, callee_id_local, {"type": "CALLS"}))
                     else:
                         # Store external call attempt
-                        if "external_calls" not in self.graph.nodes[caller_id]:
-                            self.graph.nodes[caller_id]["external_calls"] = []
-                        self.graph.nodes[caller_id]["external_calls"].append(callee)
+                        external_calls[caller_id].append(callee)
 
-        self.save()
+        for caller_id, callees in external_calls.items():
+            existing = nodes_map[caller_id].get("external_calls", [])
+            self._set_node_properties(caller_id, external_calls=existing + callees)
+
+        self.add_relationships(edges)
 
     def get_project_summary(self) -> str:
         """
@@ -321,12 +989,7 @@ class NetworkXAdapter:
         summary += f"- Total Edges: {stats['edges']}\n"
 
         # Count by label
-        counts = {}
-        for _, data in self.graph.nodes(data=True):
-            for label in data.get("labels", []):
-                counts[label] = counts.get(label, 0) + 1
-
-        for label, count in counts.items():
+        for label, count in self.get_label_counts().items():
             summary += f"- {label}s: {count}\n"
 
         return summary
@@ -334,7 +997,26 @@ class NetworkXAdapter:
     def get_context_for_file(self, file_path: str, repo_name: str) -> str:
         """
         Get connected nodes for a file to provide context for LLM.
+        Results are memoised until the graph next changes.
         """
+        if self._context_version != self._mut_version:
+            self._context_cache.clear()
+            self._context_version = self._mut_version
+
+        key = (file_path, repo_name)
+        context = self._context_cache.get(key)
+        if context is not None:
+            self._context_cache.move_to_end(key)
+            return context
+
+        context = self._build_context_for_file(file_path, repo_name)
+        self._context_cache[key] = context
+        if len(self._context_cache) > CONTEXT_CACHE_SIZE:
+            self._context_cache.popitem(last=False)
+        return context
+
+    def _build_context_for_file(self, file_path: str, repo_name: str) -> str:
+        """Uncached body of get_context_for_file"""
         file_id = f"{repo_name}:{file_path}"
         if not self.graph.has_node(file_id):
             return f"No graph data for {file_path}"
@@ -348,21 +1030,20 @@ class NetworkXAdapter:
             context.append(f"Imports: {', '.join(imports)}")
 
         # 2. Classes/Functions defined in file
-        contains = self.get_neighbors(file_id, direction="out")
+        nodes = self.graph.nodes
+        adj = self.graph.adj
         defined = []
-        for child_id in contains:
-            data = self.graph.nodes[child_id]
-            if "Class" in data.get("labels", []) or "Function" in data.get(
-                "labels", []
-            ):
+        classes = self._label_index.get("Class", ())
+        functions = self._label_index.get("Function", ())
+        for child_id in self.iter_neighbors(file_id, direction="out"):
+            if child_id in classes or child_id in functions:
+                data = nodes[child_id]
                 defined.append(data.get("name", "unknown"))
 
                 # 3. Calls made by these functions
-                calls = self.get_neighbors(child_id, direction="out")
-                for call_target in calls:
-                    call_data = self.graph.nodes[call_target]
-                    edge_data = self.graph.get_edge_data(child_id, call_target)
-                    if edge_data and edge_data.get("type") == "CALLS":
+                for call_target, edge_data in adj[child_id].items():
+                    if edge_data.get("type") == "CALLS":
+                        call_data = nodes[call_target]
                         context.append(
                             f"Function '{data.get('name')}' calls '{call_data.get('name')}'"
                         )
@@ -377,80 +1058,113 @@ class NetworkXAdapter:
         self, analysis, repo_id: str, commit_hash: str = "HEAD", session_id: str = None
     ):
         """Store file analysis (Neo4j-compatible interface)"""
-        file_id = f"{repo_id}:{analysis.file_path}"
+        # Interned so the graph, its adjacency and the indexes share one key
+        file_id = sys.intern(f"{repo_id}:{analysis.file_path}")
 
         # Store file node
-        self.add_node(
-            file_id,
-            labels=["File"],
-            path=analysis.file_path,
-            loc=analysis.loc,
-            language=analysis.language,
-            repo_id=repo_id,
-            session_id=session_id,
-            commit_hash=commit_hash,
-            resolved_imports=analysis.resolved_imports,  # Store resolved imports for linking
-            raw_calls=analysis.calls,  # Store raw calls for linking
-        )
+        nodes = [
+            (
+                file_id,
+                ["File"],
+                {
+                    "path": analysis.file_path,
+                    "loc": analysis.loc,
+                    "language": analysis.language,
+                    "repo_id": repo_id,
+                    "session_id": session_id,
+                    "commit_hash": commit_hash,
+                    # Store resolved imports and raw calls for linking
+                    "resolved_imports": analysis.resolved_imports,
+                    "raw_calls": analysis.calls,
+                },
+            )
+        ]
+        edges = []
 
         # Store classes
         for cls in analysis.classes:
             class_id = f"{file_id}::{cls.name}"
-            self.add_node(
-                class_id,
-                labels=["Class"],
-                name=cls.name,
-                start_line=cls.start_line,
-                end_line=cls.end_line,
-                session_id=session_id,
+            nodes.append(
+                (
+                    class_id,
+                    ["Class"],
+                    {
+                        "name": cls.name,
+                        "start_line": cls.start_line,
+                        "end_line": cls.end_line,
+                        "session_id": session_id,
+                    },
+                )
             )
-            self.add_relationship(file_id, class_id, "CONTAINS")
+            edges.append((file_id, class_id, {"type": "CONTAINS"}))
 
             # Store methods
             for method in cls.methods:
                 method_id = f"{class_id}::{method.name}"
-                self.add_node(
-                    method_id,
-                    labels=["Function", "Method"],
-                    name=method.name,
-                    start_line=method.start_line,
-                    end_line=method.end_line,
-                    session_id=session_id,
+                nodes.append(
+                    (
+                        method_id,
+                        ["Function", "Method"],
+                        {
+                            "name": method.name,
+                            "start_line": method.start_line,
+                            "end_line": method.end_line,
+                            "session_id": session_id,
+                        },
+                    )
                 )
-                self.add_relationship(class_id, method_id, "DEFINES_METHOD")
+                edges.append((class_id, method_id, {"type": "DEFINES_METHOD"}))
 
         # Store functions
         for func in analysis.functions:
             func_id = f"{file_id}::{func.name}"
-            self.add_node(
-                func_id,
-                labels=["Function"],
-                name=func.name,
-                start_line=func.start_line,
-                end_line=func.end_line,
-                session_id=session_id,
+            nodes.append(
+                (
+                    func_id,
+                    ["Function"],
+                    {
+                        "name": func.name,
+                        "start_line": func.start_line,
+                        "end_line": func.end_line,
+                        "session_id": session_id,
+                    },
+                )
             )
-            self.add_relationship(file_id, func_id, "DEFINES_FUNCTION")
+            edges.append((file_id, func_id, {"type": "DEFINES_FUNCTION"}))
 
-        # Auto-save after each analysis
-        self.save()
+        self.add_nodes(nodes)
+        self.add_relationships(edges)
 
     def link_unresolved_calls(self):
         """Link unresolved function calls (Neo4j-compatible)"""
         logger.info("Linking cross-file call relationships in NetworkX...")
 
-        # Iterate all File nodes to process their raw calls
-        file_nodes = self.find_nodes(label="File")
+        # Iterate all File nodes to process their raw calls, reading their
+        # attribute dicts in place rather than find_nodes() copies
+        nodes_map = self._nodes_map()
+        file_ids = list(self._label_index.get("File", ()))
+        edges = []
+        # target file id -> {top-level symbol name: node id}, built on first use
+        file_symbols: Dict[str, Dict[str, str]] = {}
 
-        for file_node in file_nodes:
-            file_id = file_node["id"]
-            repo_id = file_node.get("repo_id")
-            raw_calls = file_node.get("raw_calls", [])
-            resolved_imports = file_node.get("resolved_imports", {})
+        for file_id in file_ids:
+            file_data = nodes_map[file_id]
+            repo_id = file_data.get("repo_id")
+            raw_calls = file_data.get("raw_calls", ())
+            resolved_imports = file_data.get("resolved_imports", {})
 
             if not raw_calls:
                 continue
 
+            # Resolve names through per-file tables keyed by the short symbol
+            # name instead of formatting and hashing "<file_id>::<name>" per call
+            top_symbols = file_symbols.get(file_id)
+            if top_symbols is None:
+                top_symbols = file_symbols[file_id] = self._top_level_symbols(file_id)
+            local_symbols = self._local_symbols(file_id)
+            # import alias -> symbol table of the file it resolves to
+            module_symbols: Dict[str, Dict[str, str]] = {}
+
             for call in raw_calls:
                 caller_name = call.get("caller")
                 callee_name = call.get("callee")
@@ -459,60 +1173,33 @@ class NetworkXAdapter:
                     continue
 
                 # 1. Resolve Caller ID
-                # Try explicit function first (top-level)
-                caller_id = f"{file_id}::{caller_name}"
-
-                # If not found, check if it's a method content (class::method)
-                if caller_name and "." in caller_name:
-                    # This logic depends on how AST parser reports caller name for methods
-                    pass
-
-                # Verify caller exists in graph
-                if not self.graph.has_node(caller_id):
-                    # Try finding if it's a method
-                    # This is tricky without knowing the class name if AST just says 'method_name'
-                    # But ASTParser usually reports 'caller' as the function name enclosing the call.
-                    # If it's a method, it might be nested.
-                    # For now, assume top-level or search children of file.
-                    potential_callers = [
-                        n
-                        for n in self.graph.successors(file_id)
-                        if n.endswith(f"::{caller_name}")
-                    ]
-                    # Also check classes
-                    if not potential_callers:
-                        # Check methods in classes
-                        for succ in self.graph.successors(file_id):
-                            if "Class" in self.graph.nodes[succ].get("labels", []):
-                                for method in self.graph.successors(succ):
-                                    if method.endswith(f"::{caller_name}"):
-                                        potential_callers.append(method)
-
-                    if potential_callers:
-                        caller_id = potential_callers[0]  # Pick first match
-                    else:
-                        # logger.debug(f"Caller node not found: {caller_id}")
+                # Try explicit function first (top-level), then any symbol
+                # defined in the file (classes, class methods)
+                caller_id = top_symbols.get(caller_name)
+                if caller_id is None:
+                    caller_id = local_symbols.get(caller_name)
+                    if caller_id is None:
                         continue
 
                 # 2. Resolve Callee ID
-                callee_id = None
-
                 # Case A: Local call (in same file)
-                local_target_candidate = f"{file_id}::{callee_name}"
-                if self.graph.has_node(local_target_candidate):
-                    callee_id = local_target_candidate
+                callee_id = top_symbols.get(callee_name)
 
                 # Case B: Imported call (e.g. db.connect)
-                elif "." in callee_name:
+                if callee_id is None and "." in callee_name:
                     module_part, func_part = callee_name.split(".", 1)
-                    if module_part in resolved_imports:
-                        target_file_path = resolved_imports[module_part]
+                    symbols = module_symbols.get(module_part)
+                    if symbols is None and module_part in resolved_imports:
                         # Target file ID
-                        target_file_id = f"{repo_id}:{target_file_path}"
-                        target_func_id = f"{target_file_id}::{func_part}"
-
-                        if self.graph.has_node(target_func_id):
-                            callee_id = target_func_id
+                        target_file_id = f"{repo_id}:{resolved_imports[module_part]}"
+                        symbols = file_symbols.get(target_file_id)
+                        if symbols is None:
+                            symbols = file_symbols[
+                                target_file_id
+                            ] = self._top_level_symbols(target_file_id)
+                        module_symbols[module_part] = symbols
+                    if symbols:
+                        callee_id = symbols.get(func_part)
 
                 # Case C: From x import y (Direct import)
                 elif callee_name in resolved_imports:
@@ -523,10 +1210,48 @@ class NetworkXAdapter:
                     pass
 
                 if callee_id:
-                    self.add_relationship(caller_id, callee_id, "CALLS")
+                    edges.append((caller_id, callee_id, {"type": "CALLS"}))
                     # logger.debug(f"Linked call: {caller_id} -> {callee_id}")
 
-        self.save()
+        self.add_relationships(edges)
+
+    def _nodes_map(self) -> Dict[str, Dict[str, Any]]:
+        """
+        The graph's node -> attributes dict, for membership tests in hot
+        loops (what has_node() checks, minus the method call).
+        """
+        nodes_map = getattr(self.graph, "_node", None)
+        return nodes_map if nodes_map is not None else self.graph.nodes
+
+    def _top_level_symbols(self, file_id: str) -> Dict[str, str]:
+        """Map names of a file's direct children to their node IDs"""
+        if file_id not in self.graph:
+            return {}
+        prefix = f"{file_id}::"
+        return {
+            child[len(prefix) :]: child
+            for child in self.graph.successors(file_id)
+            if child.startswith(prefix)
+        }
+
+    def _local_symbols(self, file_id: str) -> Dict[str, str]:
+        """
+        Map symbol names defined in a file to their node IDs.
+        Direct children of the file take precedence over class methods;
+        within each group the first match wins.
+        """
+        symbols = {}
+        methods = {}
+        classes = self._label_index.get("Class", ())
+        for child in self.graph.successors(file_id):
+            symbols.setdefault(child.rpartition("::")[2], child)
+            if child in classes:
+                for method in self.graph.successors(child):
+                    methods.setdefault(method.rpartition("::")[2], method)
+
+        for name, method in methods.items():
+            symbols.setdefault(name, method)
+        return symbols
 
     def init_schema(self):
         """Initialize schema (Neo4j-compatible, no-op for NetworkX)"""
@@ -1,11 +1,19 @@
+import atexit
 import sqlite3
 import json
 import logging
+import threading
+import time
+from dataclasses import dataclass
 from pathlib import Path
-from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 from uuid import UUID
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 from langchain_core.callbacks import BaseCallbackHandler
 from langchain_core.messages import BaseMessage
 from langchain_core.outputs import LLMResult
@@ -20,33 +28,90 @@ def get_config():
 
 logger = logging.getLogger("yaver.interaction")
 
+# message type -> "[TYPE]: " prompt prefix
+_ROLE_PREFIXES: Dict[str, str] = {}
+
+# Failed runs are dropped in on_llm_error; runs that reach neither callback
+# (aborted streams) are dropped after RUN_TTL seconds by a sweep that runs
+# every RUN_SWEEP_INTERVAL run starts, so it keeps running while calls fail
+RUN_TTL = 300.0
+RUN_SWEEP_INTERVAL = 100
+
+_NS_PER_DAY = 86_400 * 1_000_000_000
+
+# One constant statement text so every insert hits the connection's
+# prepared-statement cache (keyed by the SQL string)
+_INSERT_SQL = "INSERT INTO interactions VALUES (?, ?, ?, ?, ?, ?, ?, ?)"
+_STATEMENT_CACHE_SIZE = 128
+
+
+def _to_text(value: Union[str, Dict[str, Any], List[Any]]) -> str:
+    """Payload column text: strings as-is, structured values as JSON"""
+    if isinstance(value, str):
+        return value
+    if orjson is not None:
+        try:
+            return orjson.dumps(value).decode()
+        except TypeError:
+            pass
+    return json.dumps(value, default=str)
+
+
+def _default_db_path() -> str:
+    """Interaction DB location: next to the configured log file"""
+    config = get_config()
+    log_dir = Path(config.logging.log_file).parent
+    return str(log_dir / "interaction_history.sqlite")
+
 
 class InteractionDB:
     """SQLite Database manager for LLM interactions"""
 
     def __init__(self, db_path: Optional[str] = None):
-        if not db_path:
-            config = get_config()
-            # Use log directory for DB
-            log_dir = Path(config.logging.log_file).parent
-            db_path = str(log_dir / "interaction_history.sqlite")
-
-        self.db_path = db_path
+        self.db_path = db_path or _default_db_path()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._insert_cursor = None
         self._init_db()
         self._prune_old_records()
 
+    def _connect(self) -> sqlite3.Connection:
+        """Open the long-lived connection (autocommit, WAL journaling)"""
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            cached_statements=_STATEMENT_CACHE_SIZE,
+        )
+        # Pruned pages are handed back with PRAGMA incremental_vacuum. The
+        # mode only sticks on a new file, and only before WAL is enabled;
+        # older files switch over on their next VACUUM.
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        # WAL + NORMAL: commits append to the WAL without an fsync each time
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            if self._conn is not None:
+                self._insert_cursor = None
+                self._conn.close()
+                self._conn = None
+
     def _init_db(self):
         """Initialize database schema"""
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            self._conn = self._connect()
+            cursor = self._conn.cursor()
 
             # Create interactions table
             cursor.execute(
                 """
                 CREATE TABLE IF NOT EXISTS interactions (
                     id TEXT PRIMARY KEY,
-                    timestamp TEXT,
+                    timestamp INTEGER NOT NULL,
                     model TEXT,
                     inputs TEXT,
                     outputs TEXT,
@@ -57,65 +122,116 @@ class InteractionDB:
             """
             )
 
+            self._migrate_text_timestamps(cursor)
+
             # Create index on timestamp for pruning
             cursor.execute(
                 """
                 CREATE INDEX IF NOT EXISTS idx_timestamp ON interactions(timestamp)
             """
             )
-
-            conn.commit()
-            conn.close()
         except Exception as e:
             logger.error(f"Failed to initialize Interaction DB: {e}")
 
+    def _migrate_text_timestamps(self, cursor: sqlite3.Cursor):
+        """
+        Convert tables created with ISO-8601 TEXT timestamps to unix-nanosecond
+        INTEGERs. The column affinity can't be altered in place, so the table
+        is rebuilt once.
+        """
+        cursor.execute("PRAGMA table_info(interactions)")
+        column_types = {row[1]: row[2].upper() for row in cursor.fetchall()}
+        if column_types.get("timestamp") != "TEXT":
+            return
+
+        logger.info("Migrating interaction timestamps to integer nanoseconds")
+        cursor.execute("BEGIN")
+        try:
+            cursor.execute("DROP INDEX IF EXISTS idx_timestamp")
+            cursor.execute("ALTER TABLE interactions RENAME TO interactions_old")
+            cursor.execute(
+                """
+                CREATE TABLE interactions (
+                    id TEXT PRIMARY KEY,
+                    timestamp INTEGER NOT NULL,
+                    model TEXT,
+                    inputs TEXT,
+                    outputs TEXT,
+                    tokens_in INTEGER,
+                    tokens_out INTEGER,
+                    run_id TEXT
+                )
+            """
+            )
+            # Timestamps were naive local-time isoformat() strings; unparseable
+            # ones become 0 so the next prune drops them first
+            cursor.execute(
+                """
+                INSERT INTO interactions
+                SELECT id,
+                       COALESCE(CAST((julianday(timestamp, 'utc') - 2440587.5)
+                                     * 86400000000000 AS INTEGER), 0),
+                       model, inputs, outputs, tokens_in, tokens_out, run_id
+                FROM interactions_old
+            """
+            )
+            cursor.execute("DROP TABLE interactions_old")
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+
     def log_interaction(
         self,
         run_id: str,
         model: str,
-        inputs: str,
-        outputs: str,
+        inputs: Union[str, Dict[str, Any], List[Any]],
+        outputs: Union[str, Dict[str, Any], List[Any]],
         tokens_in: int = 0,
         tokens_out: int = 0,
     ):
         """Log a completed interaction"""
+        if self._conn is None:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
-
-            cursor.execute(
-                """
-                INSERT INTO interactions (id, timestamp, model, inputs, outputs, tokens_in, tokens_out, run_id)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    str(run_id),
-                    datetime.now().isoformat(),
-                    model,
-                    inputs,
-                    outputs,
-                    tokens_in,
-                    tokens_out,
-                    str(run_id),
-                ),
-            )
-
-            conn.commit()
-            conn.close()
+            with self._lock:
+                if self._insert_cursor is None:
+                    self._insert_cursor = self._conn.cursor()
+                # Columns: id, timestamp, model, inputs, outputs,
+                # tokens_in, tokens_out, run_id
+                self._insert_cursor.execute(
+                    _INSERT_SQL,
+                    (
+                        str(run_id),
+                        time.time_ns(),
+                        model,
+                        _to_text(inputs),
+                        _to_text(outputs),
+                        tokens_in,
+                        tokens_out,
+                        str(run_id),
+                    ),
+                )
         except Exception as e:
             logger.error(f"Failed to log interaction: {e}")
 
     def _prune_old_records(self, max_records: int = 2000, days_to_keep: int = 7):
         """Prune database to prevent bloating"""
+        if self._conn is None:
+            return
         try:
-            conn = sqlite3.connect(self.db_path)
-            cursor = conn.cursor()
+            cursor = self._conn.cursor()
+            cutoff_ns = time.time_ns() - days_to_keep * _NS_PER_DAY
+
+            # Nothing to prune: skip both DELETEs and the vacuum
+            cursor.execute("SELECT COUNT(*), MIN(timestamp) FROM interactions")
+            count, oldest = cursor.fetchone()
+            if count <= max_records and (oldest is None or oldest >= cutoff_ns):
+                return
 
             # 1. Date based pruning
-            cutoff_date = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
-            cursor.execute(
-                "DELETE FROM interactions WHERE timestamp < ?", (cutoff_date,)
-            )
+            cursor.execute("DELETE FROM interactions WHERE timestamp < ?", (cutoff_ns,))
+            pruned = cursor.rowcount
 
             # 2. Count based pruning (keep latest N)
             cursor.execute("SELECT COUNT(*) FROM interactions")
@@ -135,15 +251,44 @@ class InteractionDB:
                 """,
                     (to_delete,),
                 )
+                pruned += cursor.rowcount
+
+            # 3. Reclaim space. Incremental mode only truncates the free pages;
+            # a file created before it gets one full VACUUM, which converts it
+            if pruned > 0:
+                cursor.execute("PRAGMA auto_vacuum")
+                if cursor.fetchone()[0] == 2:  # INCREMENTAL
+                    # executescript steps the pragma to completion (a plain
+                    # execute frees a single page)
+                    cursor.executescript("PRAGMA incremental_vacuum;")
+                else:
+                    cursor.execute("VACUUM")
+        except Exception as e:
+            logger.error(f"Failed to prune interaction DB: {e}")
 
-            conn.commit()
 
-            # 3. Vacuum to reclaim space
-            cursor.execute("VACUUM")
+_DB_INSTANCES: Dict[str, InteractionDB] = {}
+_DB_INSTANCES_LOCK = threading.Lock()
 
-            conn.close()
-        except Exception as e:
-            logger.error(f"Failed to prune interaction DB: {e}")
+
+def get_interaction_db(db_path: Optional[str] = None) -> InteractionDB:
+    """Shared InteractionDB per database file (schema setup and pruning run once)"""
+    key = str(Path(db_path or _default_db_path()).resolve())
+    with _DB_INSTANCES_LOCK:
+        db = _DB_INSTANCES.get(key)
+        if db is None:
+            db = _DB_INSTANCES[key] = InteractionDB(key)
+            atexit.register(db.close)
+        return db
+
+
+@dataclass(slots=True)
+class RunState:
+    """In-flight LLM run awaiting its on_llm_end"""
+
+    inputs: str
+    model: str
+    start_time: float  # time.monotonic()
 
 
 class SQLLoggingCallback(BaseCallbackHandler):
@@ -151,9 +296,10 @@ class SQLLoggingCallback(BaseCallbackHandler):
 
     def __init__(self, model_name: str = "unknown"):
         super().__init__()
-        self.db = InteractionDB()
-        self.runs = {}
+        self.db = get_interaction_db()
+        self.runs: Dict[UUID, RunState] = {}
         self.model_name = model_name
+        self._started = 0
 
     def on_chat_model_start(
         self,
@@ -166,22 +312,24 @@ class SQLLoggingCallback(BaseCallbackHandler):
     ) -> Any:
         """Run when LLM starts running."""
         # Convert messages to string representation
-        prompt_text = ""
+        parts = []
         for batch in messages:
             for msg in batch:
-                prefix = f"[{msg.type.upper()}]"
-                prompt_text += f"{prefix}: {msg.content}\n---\n"
+                prefix = _ROLE_PREFIXES.get(msg.type)
+                if prefix is None:
+                    prefix = _ROLE_PREFIXES[msg.type] = f"[{msg.type.upper()}]: "
+                parts.append(f"{prefix}{msg.content}\n---\n")
+        prompt_text = "".join(parts)
 
         # Use provided model name, fallback to serialized if "unknown" was passed
         model_name = self.model_name
         if model_name == "unknown":
             model_name = serialized.get("kwargs", {}).get("model", "unknown")
 
-        self.runs[run_id] = {
-            "inputs": prompt_text,
-            "model": model_name,
-            "start_time": datetime.now(),
-        }
+        self.runs[run_id] = RunState(prompt_text, model_name, time.monotonic())
+        self._started += 1
+        if self._started % RUN_SWEEP_INTERVAL == 0:
+            self._sweep_stale_runs()
 
     def on_llm_end(
         self,
@@ -197,19 +345,38 @@ class SQLLoggingCallback(BaseCallbackHandler):
             return
 
         # Extract output text
-        output_text = ""
         tokens_out = 0
 
-        for generation_list in response.generations:
-            for generation in generation_list:
-                output_text += generation.text + "\n"
+        output_text = "".join(
+            f"{generation.text}\n"
+            for generation_list in response.generations
+            for generation in generation_list
+        )
 
         # Log to DB
         self.db.log_interaction(
             run_id=str(run_id),
-            model=run_data["model"],
-            inputs=run_data["inputs"],
+            model=run_data.model,
+            inputs=run_data.inputs,
             outputs=output_text,
             tokens_in=0,  # Usage metadata might not be available in simple responses
             tokens_out=tokens_out,
         )
+
+    def on_llm_error(
+        self,
+        error: BaseException,
+        *,
+        run_id: UUID,
+        parent_run_id: Optional[UUID] = None,
+        **kwargs: Any,
+    ) -> Any:
+        """Run when LLM errors; the run will never reach on_llm_end."""
+        self.runs.pop(run_id, None)
+
+    def _sweep_stale_runs(self):
+        """Drop runs older than RUN_TTL that never completed"""
+        cutoff = time.monotonic() - RUN_TTL
+        stale = [rid for rid, run in self.runs.items() if run.start_time < cutoff]
+        for rid in stale:
+            del self.runs[rid]
@@ -37,7 +37,8 @@ def ingest_repository(
 
     # 2. Graph Ingestion (Structure)
     logger.info("Starting Graph Ingestion (Neo4j)...")
-    if graph_mgr.driver:
+    graph_ok = bool(graph_mgr.adapter)
+    if graph_ok:
         try:
             # A. Store Code Structure (Classes/Functions)
             for item in code_structure:
@@ -50,73 +51,118 @@ def ingest_repository(
                     # is usually better called with full analysis data.
                     graph_mgr.store_code_structure(file_path, repo_name, item)
                     stats["neo4j"] += 1
-
-            # B. Store File Nodes (Metadata)
-            for file in file_analyses:
-                graph_mgr.store_file_node(
-                    file_path=file.file_path,
-                    repo_name=repo_name,
-                    language=file.language,
-                    loc=file.lines_of_code,
-                )
         except Exception as e:
+            graph_ok = False
             msg = f"Graph ingestion error: {e}"
             logger.error(msg)
             stats["errors"].append(msg)
     else:
         stats["errors"].append("Neo4j driver not available")
 
-    # 2.5 Build System Ingestion (Graph)
-    logger.info("Ingesting Build Analysis...")
+    # B. Single pass over the analyses: file nodes, build targets and the
+    # vector summaries are all collected from the same FileAnalysis, then
+    # written with one batch per backend. A stage whose build context fails
+    # is switched off after its first error, as the separate passes did.
+    logger.info("Ingesting file metadata, build analysis and semantics...")
+    build_ok = True
     try:
         build_analyzer = BuildAnalyzer(repo_path)
-        for file in file_analyses:
-            ctx = build_analyzer.get_build_context_for_file(file.file_path)
-            for cmd in ctx.get("commands", []):
-                # We treat the command itself as the target name for uniqueness
-                # e.g. "make test" -> target="test"
-                target_name = (
-                    cmd.split(" ")[1] if "make" in cmd and len(cmd.split()) > 1 else cmd
-                )
-
-                graph_mgr.store_build_target(
-                    name=target_name,
-                    build_type=ctx.get("build_type", "unknown"),
-                    cmd=cmd,
-                    dependent_files=[file.file_path],
-                    repo_name=repo_name,
-                )
-        stats["neo4j"] += 1  # Count generic build update
     except Exception as e:
+        build_ok = False
         msg = f"Build Analysis ingestion error: {e}"
         logger.error(msg)
         stats["errors"].append(msg)
 
-    # 3. Vector Ingestion (Semantics)
-    logger.info("Starting Vector Ingestion (Qdrant)...")
-    try:
-        for file in file_analyses:
-            # Create a rich semantic summary for the file
-            content_snippet = f"""
+    file_nodes = []
+    build_targets = []
+    memories = []
+    for file in file_analyses:
+        file_nodes.append(
+            {
+                "file_path": file.file_path,
+                "language": file.language,
+                "loc": file.lines_of_code,
+            }
+        )
+
+        if build_ok:
+            try:
+                ctx = build_analyzer.get_build_context_for_file(file.file_path)
+                for cmd in ctx.get("commands", []):
+                    # We treat the command itself as the target name for uniqueness
+                    # e.g. "make test" -> target="test"
+                    target_name = (
+                        cmd.split(" ")[1]
+                        if "make" in cmd and len(cmd.split()) > 1
+                        else cmd
+                    )
+
+                    build_targets.append(
+                        {
+                            "name": target_name,
+                            "build_type": ctx.get("build_type", "unknown"),
+                            "cmd": cmd,
+                            "dependent_files": [file.file_path],
+                        }
+                    )
+            except Exception as e:
+                build_ok = False
+                msg = f"Build Analysis ingestion error: {e}"
+                logger.error(msg)
+                stats["errors"].append(msg)
+
+        # Create a rich semantic summary for the file
+        content_snippet = f"""
             File: {file.file_path}
             Language: {file.language}
             Lines of Code: {file.lines_of_code}
             Complexity: {file.complexity}
             Security Issues: {len(file.security_issues)}
             """
-
-            # Add to Qdrant
-            mem_mgr.add_memory(
-                content=content_snippet,
-                memory_type=MemoryType.CODE_PATTERN,
-                metadata={
+        memories.append(
+            {
+                "content": content_snippet,
+                "metadata": {
                     "repo": repo_name,
                     "path": file.file_path,
                     "type": "file_summary",
                 },
-            )
-            stats["qdrant"] += 1
+            }
+        )
 
+    if graph_ok:
+        try:
+            graph_mgr.store_file_nodes(file_nodes, repo_name)
+        except Exception as e:
+            graph_ok = False
+            msg = f"Graph ingestion error: {e}"
+            logger.error(msg)
+            stats["errors"].append(msg)
+
+    if build_ok:
+        try:
+            graph_mgr.store_build_targets(build_targets, repo_name)
+        except Exception as e:
+            build_ok = False
+            msg = f"Build Analysis ingestion error: {e}"
+            logger.error(msg)
+            stats["errors"].append(msg)
+
+    if build_ok:
+        stats["neo4j"] += 1  # Count generic build update
+
+    # Precompute node degrees so hub lookups don't rescan the repository
+    if graph_ok:
+        try:
+            graph_mgr.update_degrees(repo_name)
+        except Exception as e:
+            logger.warning(f"Failed to update node degrees: {e}")
+
+    # 3. Vector Ingestion (Semantics) - one embedding batch for all files
+    logger.info("Starting Vector Ingestion (Qdrant)...")
+    try:
+        ids = mem_mgr.add_memories(memories, MemoryType.CODE_PATTERN)
+        stats["qdrant"] += len(ids)
     except Exception as e:
         msg = f"Vector ingestion error: {e}"
         logger.error(msg)
@@ -139,39 +185,25 @@ def retrieve_project_insights(repo_name: str) -> str:
 
     # 1. Graph Insights (Neo4j)
     graph_mgr = GraphManager()
-    if graph_mgr.driver:
+    if graph_mgr.adapter:
         try:
-            with graph_mgr.driver.session() as session:
-                # A. Find Central Hubs (Nodes with most relationships)
-                # Filter by repo_name using path matching or explicit property if added.
-                # Since we added repo_name property to Function and Class nodes, we can use it.
-                # Fallback to path check if repo_name is missing (for older nodes)
-                query = """
-                MATCH (n)
-                WHERE n.repo_name = $repo_name
-                WITH n
-                MATCH (n)-[r]-()
-                RETURN coalesce(n.path, n.file_path) as file, n.name as symbol, labels(n)[0] as type, count(r) as degree
-                ORDER BY degree DESC
-                LIMIT 5
-                """
-                result = session.run(query, repo_name=repo_name)
-                hubs = []
-                for r in result:
-                    identifier = r["symbol"] if r["symbol"] else r["file"]
-                    if identifier:
-                        hubs.append(
-                            f"- {r['type']} '{identifier}': {r['degree']} connections (Central Component)"
-                        )
-
-                if hubs:
-                    insights.append("\n**Structural Hubs (GraphDB):**")
-                    insights.extend(hubs)
-                else:
-                    insights.append(
-                        "\n**Structural Hubs:** None detected (Graph might be sparse)."
+            # A. Find Central Hubs (Nodes with most relationships)
+            hubs = []
+            for r in graph_mgr.get_hubs(repo_name, limit=5):
+                identifier = r["symbol"] if r["symbol"] else r["file"]
+                if identifier:
+                    hubs.append(
+                        f"- {r['type']} '{identifier}': {r['degree']} connections (Central Component)"
                     )
 
+            if hubs:
+                insights.append("\n**Structural Hubs (GraphDB):**")
+                insights.extend(hubs)
+            else:
+                insights.append(
+                    "\n**Structural Hubs:** None detected (Graph might be sparse)."
+                )
+
         except Exception as e:
             logger.error(f"Graph retrieval failed: {e}")
             insights.append(f"\nGraph Retrieval Error: {e}")
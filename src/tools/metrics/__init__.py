@@ -4,8 +4,11 @@ Extracts code quality metrics from analyzed repository data.
 """
 
 import logging
-from typing import Dict, List, Any, Tuple
-from dataclasses import dataclass, asdict
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Dict, List, Any, Tuple, Literal, Iterator
+from dataclasses import dataclass
 
 # Import new metric calculators
 from .base import MetricCalculator
@@ -13,8 +16,79 @@ from .complexity import MetricsManager
 
 logger = logging.getLogger(__name__)
 
+# Functions above this complexity count as "high complexity"
+HIGH_COMPLEXITY_THRESHOLD = 8
+# Most complex functions returned individually; the rest only feed aggregates
+COMPLEXITY_TOP_N = 50
+# Rows per page when walking every function's metrics
+COMPLEXITY_PAGE_SIZE = 10_000
+# Analyses kept per MetricsAnalyzer, keyed by repository version
+ANALYSIS_CACHE_SIZE = 64
+# Entry points that are never "called" but aren't dead code either
+DEAD_CODE_EXEMPT_NAMES = ["__init__", "__main__", "main"]
+
+# Query texts are fixed (everything variable is a parameter) so the server's
+# plan cache reuses one compiled plan across calls and repositories
+# RETURN order of _Q_COMPLEXITY matches the ComplexityMetric fields
+_Q_COMPLEXITY = """
+MATCH (f:Function)-[:DEFINED_IN]->(file:File {repo_id: $repo_id})
+WITH f, file, COUNT { (f)-[:CALLS]->() } as call_count
+RETURN f.id as function_id,
+       f.name as function_name,
+       file.path as file_path,
+       toFloat(1 + call_count) as complexity_score,
+       coalesce(f.end_line - f.start_line, 0) as loc,
+       coalesce(size(f.args), 0) as parameters,
+       coalesce(f.has_docstring, false) as has_docstring
+ORDER BY complexity_score DESC, function_id
+SKIP $skip
+LIMIT $top_n
+"""
+
+# Changes whenever a file of the repository is (re)analyzed, and through
+# Repo.graph_version whenever a write batch (call linking, layer tagging)
+# finishes
+_Q_REPO_VERSION = """
+MATCH (file:File {repo_id: $repo_id})
+WITH max(file.last_analyzed) as last_analyzed, count(file) as files
+OPTIONAL MATCH (repo:Repo {id: $repo_id})
+RETURN last_analyzed, files, repo.graph_version as graph_version
+"""
+
+_Q_COMPLEXITY_STATS = """
+MATCH (f:Function)-[:DEFINED_IN]->(file:File {repo_id: $repo_id})
+WITH 1 + COUNT { (f)-[:CALLS]->() } as complexity_score,
+     coalesce(f.has_docstring, false) as has_docstring
+RETURN count(*) as total,
+       avg(complexity_score) as avg_complexity,
+       sum(CASE WHEN complexity_score > $threshold THEN 1 ELSE 0 END) as high_count,
+       sum(CASE WHEN has_docstring THEN 1 ELSE 0 END) as documented
+"""
+
+# RETURN order of _Q_DEAD_CODE matches the DeadCodeIssue fields; each issue
+# kind (only unreachable functions so far) classifies its own severity, so
+# further kinds are added as UNION branches without another round-trip
+_Q_DEAD_CODE = """
+MATCH (f:Function)-[:DEFINED_IN]->(file:File {repo_id: $repo_id})
+WHERE NOT EXISTS { (f)<-[:CALLS]-() }
+  AND NOT f.name IN $exempt_names
+RETURN 'unreachable_function' as issue_type,
+       f.id as entity_id,
+       f.name as entity_name,
+       file.path as file_path,
+       f.start_line as line_number,
+       'medium' as severity
+"""
 
-@dataclass
+_Q_DEAD_CODE_COUNT = """
+MATCH (f:Function)-[:DEFINED_IN]->(:File {repo_id: $repo_id})
+WHERE NOT EXISTS { (f)<-[:CALLS]-() }
+  AND NOT f.name IN $exempt_names
+RETURN count(f) as count
+"""
+
+
+@dataclass(slots=True, frozen=True)
 class ComplexityMetric:
     """Cyclomatic complexity metric for a function"""
 
@@ -27,7 +101,7 @@ class ComplexityMetric:
     has_docstring: bool
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DeadCodeIssue:
     """Dead code detection result"""
 
@@ -39,7 +113,7 @@ class DeadCodeIssue:
     severity: str  # "low", "medium", "high"
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class QualityScore:
     """Overall quality metrics for repository"""
 
@@ -50,26 +124,118 @@ class QualityScore:
     maintainability_index: float  # 0-100
 
 
+def _fetch(tx, query: str, params: Dict[str, Any]) -> list:
+    """Transaction function: run a read query and consume its records"""
+    return list(tx.run(query, params))
+
+
+def _to_dict(obj) -> Dict[str, Any]:
+    """
+    Shallow dict of a metrics dataclass. Every field is a primitive, so
+    this skips the recursive deep copy asdict() does.
+    """
+    return {name: getattr(obj, name) for name in obj.__dataclass_fields__}
+
+
+def _metrics_stats(metrics: List[ComplexityMetric]) -> Dict[str, Any]:
+    """The complexity_stats aggregates, computed from a list of metrics in one pass"""
+    total_complexity = 0.0
+    high_count = 0
+    documented = 0
+    for m in metrics:
+        score = m.complexity_score
+        total_complexity += score
+        high_count += score > HIGH_COMPLEXITY_THRESHOLD
+        documented += bool(m.has_docstring)
+    return {
+        "total": len(metrics),
+        "avg_complexity": total_complexity / max(len(metrics), 1),
+        "high_count": high_count,
+        "documented": documented,
+    }
+
+
+def _analysis_stats(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Aggregates from the DB when present, else computed from the metrics list
+    and stored on the analysis so later readers don't walk it again.
+    """
+    stats = analysis.get("complexity_stats")
+    if stats is None:
+        stats = analysis["complexity_stats"] = _metrics_stats(
+            analysis["complexity_metrics"]
+        )
+    return stats
+
+
+def _dead_code_count(analysis: Dict[str, Any]) -> int:
+    """Dead-code count, also known for summary-only analyses"""
+    count = analysis.get("dead_code_count")
+    return len(analysis["dead_code"]) if count is None else count
+
+
+def _copy_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copy of an analysis that callers may modify without touching the cached
+    one. The dataclasses are frozen, so only containers are copied.
+    """
+    copied = dict(analysis)
+    copied["complexity_metrics"] = list(analysis["complexity_metrics"])
+    copied["dead_code"] = list(analysis["dead_code"])
+    copied["circular_dependencies"] = [
+        {**cycle, "cycle": list(cycle["cycle"])}
+        for cycle in analysis["circular_dependencies"]
+    ]
+    if analysis.get("complexity_stats") is not None:
+        copied["complexity_stats"] = dict(analysis["complexity_stats"])
+    summary = dict(analysis["summary"])
+    summary["top_issues"] = [dict(issue) for issue in summary.get("top_issues", [])]
+    copied["summary"] = summary
+    return copied
+
+
 class MetricsAnalyzer:
     """Analyzes code quality metrics from Neo4j graph data"""
 
-    def __init__(self, neo4j_adapter):
+    def __init__(self, neo4j_adapter, max_workers: int = 4):
         """
         Initialize metrics analyzer
 
         Args:
             neo4j_adapter: Neo4j connection for querying
+            max_workers: Concurrent queries (each on its own pooled session);
+                1 runs them one after another on a single session
         """
         self.neo4j = neo4j_adapter
-
-    def analyze_repository(self, repo_id: str) -> Dict[str, Any]:
+        self.max_workers = max_workers
+        self._schema_ready = False
+        # (repo_id, detail, repo version) -> analysis
+        self._cache: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+
+    def analyze_repository(
+        self, repo_id: str, detail: Literal["summary", "full", "all"] = "full"
+    ) -> Dict[str, Any]:
         """
         Comprehensive repository analysis
 
+        Args:
+            repo_id: Repository to analyze
+            detail: "full" also lists every dead-code issue and the
+                COMPLEXITY_TOP_N most complex functions (not all of them);
+                "all" lists every function, fetched page by page through
+                iter_complexity; "summary" runs only the aggregate queries
+                and leaves those lists empty (dead_code_count still holds
+                the count). complexity_stats always covers every function.
+
         Returns:
             {
-                "complexity_metrics": [ComplexityMetric],
+                "complexity_metrics": [ComplexityMetric],  # most complex first
+                "complexity_stats": {
+                    "total": int, "avg_complexity": float,
+                    "high_count": int, "documented": int
+                },
                 "dead_code": [DeadCodeIssue],
+                "dead_code_count": int,
                 "quality_score": QualityScore,
                 "summary": {
                     "total_functions": int,
@@ -79,13 +245,16 @@ class MetricsAnalyzer:
                 }
             }
         """
-        result = {
-            "complexity_metrics": self._analyze_complexity(repo_id),
-            "dead_code": self._detect_dead_code(repo_id),
-            "circular_dependencies": self._detect_circular_deps(repo_id),
-            "quality_score": None,
-            "summary": {},
-        }
+        self._ensure_indexes()
+
+        # Repeated calls for an unchanged repository are served from cache
+        cache_key = (repo_id, detail, self._repo_version(repo_id))
+        cached = self._cache.get(cache_key)
+        if cached is not None:
+            self._cache.move_to_end(cache_key)
+            return _copy_analysis(cached)
+
+        result = self._run_queries(repo_id, detail)
 
         # Calculate overall quality score
         result["quality_score"] = self._calculate_quality_score(result)
@@ -93,110 +262,205 @@ class MetricsAnalyzer:
         # Generate summary
         result["summary"] = self._generate_summary(result)
 
+        self._cache[cache_key] = result
+        if len(self._cache) > ANALYSIS_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return _copy_analysis(result)
+
+    def _run_queries(self, repo_id: str, detail: str) -> Dict[str, Any]:
+        """
+        Run the independent read queries: concurrently, each on its own
+        session, when max_workers > 1, else in turn on one shared session.
+        """
+        if detail in ("full", "all"):
+            queries = {
+                "complexity_metrics": (
+                    self._all_complexity
+                    if detail == "all"
+                    else self._analyze_complexity
+                ),
+                "dead_code": self._detect_dead_code,
+            }
+        else:
+            queries = {"dead_code_count": self._count_dead_code}
+        queries["complexity_stats"] = self._complexity_stats
+        queries["circular_dependencies"] = self._detect_circular_deps
+
+        if self.max_workers > 1:
+            workers = min(self.max_workers, len(queries))
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    key: pool.submit(query, repo_id) for key, query in queries.items()
+                }
+                results = {key: future.result() for key, future in futures.items()}
+        else:
+            with self._session() as session:
+                results = {
+                    key: query(repo_id, session) for key, query in queries.items()
+                }
+
+        result = {
+            "complexity_metrics": [],
+            "dead_code": [],
+            **results,
+            "quality_score": None,
+            "summary": {},
+        }
+        result.setdefault("dead_code_count", len(result["dead_code"]))
         return result
 
-    def _analyze_complexity(self, repo_id: str) -> List[ComplexityMetric]:
-        """Analyze cyclomatic complexity of functions"""
-        # Query Neo4j for function metrics
-        with self.neo4j.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (f:Function)-[:DEFINED_IN]->(file:File {repo_id: $repo_id})
-                WITH f, file,
-                     size([(f)-[:CALLS]->() | 1]) as call_count,
-                     size([(f)-[:CALLS*1..2]->() | 1]) as max_depth
-                RETURN f.id as function_id,
-                       f.name as function_name,
-                       file.path as file_path,
-                       (1 + call_count) as complexity_score,
-                       (f.end_line - f.start_line) as loc,
-                       size(f.args) as parameters,
-                       coalesce(f.has_docstring, false) as has_docstring
-                ORDER BY complexity_score DESC
-            """,
-                {"repo_id": repo_id},
-            )
-
-            metrics = []
-            for record in result:
-                metrics.append(
-                    ComplexityMetric(
-                        function_id=record["function_id"],
-                        function_name=record["function_name"],
-                        file_path=record["file_path"],
-                        complexity_score=float(record["complexity_score"]),
-                        loc=record["loc"] or 0,
-                        parameters=record["parameters"] or 0,
-                        has_docstring=record["has_docstring"] or False,
-                    )
-                )
+    def invalidate_cache(self, repo_id: str = None):
+        """Drop cached analyses (of one repository, or all)"""
+        if repo_id is None:
+            self._cache.clear()
+            return
+        for key in [key for key in self._cache if key[0] == repo_id]:
+            del self._cache[key]
+
+    def _repo_version(self, repo_id: str, session=None) -> tuple:
+        """Cheap fingerprint of the repository's graph state"""
+        records = self._read(session, _Q_REPO_VERSION, repo_id=repo_id)
+        if not records:
+            return (None, 0, None)
+        record = records[0]
+        return (record["last_analyzed"], record["files"], record["graph_version"])
+
+    def _ensure_indexes(self):
+        """
+        Make sure the File.repo_id / Function.name indexes the queries seek
+        on exist (once per analyzer; init_schema tolerates missing rights).
+        """
+        if self._schema_ready:
+            return
+        self._schema_ready = True
+        if hasattr(self.neo4j, "init_schema"):
+            try:
+                self.neo4j.init_schema()
+            except Exception as e:
+                logger.warning(f"Could not ensure metrics indexes: {e}")
+
+    @contextmanager
+    def _session(self, session=None):
+        """Use the caller's session, or open one for a standalone call"""
+        if session is not None:
+            yield session
+        else:
+            # Read access lets a cluster route the session to a replica
+            with self.neo4j.driver.session(default_access_mode="READ") as session:
+                yield session
 
-            return metrics
+    def _read(self, session, query: str, **params) -> list:
+        """
+        Run a read query as a managed transaction, which the driver retries
+        on transient errors (leader switch, dropped connection)
+        """
+        with self._session(session) as session:
+            return session.execute_read(_fetch, query, params)
 
-    def _detect_dead_code(self, repo_id: str) -> List[DeadCodeIssue]:
-        """Detect dead code (unused functions, etc)"""
-        issues = []
-
-        # Find unreachable functions
-        with self.neo4j.driver.session() as session:
-            result = session.run(
-                """
-                MATCH (f:Function)-[:DEFINED_IN]->(file:File {repo_id: $repo_id})
-                WHERE NOT (f)<-[:CALLS]-()
-                  AND NOT f.name IN ['__init__', '__main__', 'main']
-                WITH f, file, 0 as incoming_calls
-                WHERE incoming_calls = 0
-                RETURN f.id as function_id,
-                       f.name as function_name,
-                       file.path as file_path,
-                       f.start_line as line_number
-            """,
-                {"repo_id": repo_id},
-            )
-
-            for record in result:
-                issues.append(
-                    DeadCodeIssue(
-                        issue_type="unreachable_function",
-                        entity_id=record["function_id"],
-                        entity_name=record["function_name"],
-                        file_path=record["file_path"],
-                        line_number=record["line_number"],
-                        severity="medium",
-                    )
+    def iter_complexity(
+        self, repo_id: str, page_size: int = COMPLEXITY_PAGE_SIZE, session=None
+    ) -> Iterator[List[ComplexityMetric]]:
+        """
+        Complexity metrics of every function, most complex first, yielded
+        one page at a time so huge repositories never sit in memory at once
+        """
+        skip = 0
+        with self._session(session) as session:
+            while True:
+                page = self._analyze_complexity(
+                    repo_id, session, top_n=page_size, skip=skip
                 )
+                if page:
+                    yield page
+                if len(page) < page_size:
+                    return
+                skip += page_size
+
+    def _all_complexity(self, repo_id: str, session=None) -> List[ComplexityMetric]:
+        """Complexity metrics of every function, collected page by page"""
+        return [
+            metric
+            for page in self.iter_complexity(repo_id, COMPLEXITY_PAGE_SIZE, session)
+            for metric in page
+        ]
+
+    def _analyze_complexity(
+        self,
+        repo_id: str,
+        session=None,
+        top_n: int = COMPLEXITY_TOP_N,
+        skip: int = 0,
+    ) -> List[ComplexityMetric]:
+        """Analyze cyclomatic complexity of the top_n most complex functions"""
+        # Query Neo4j for function metrics
+        records = self._read(
+            session, _Q_COMPLEXITY, repo_id=repo_id, top_n=top_n, skip=skip
+        )
+
+        # Columns come back non-null and in field order
+        return [ComplexityMetric(*record.values()) for record in records]
+
+    def _complexity_stats(self, repo_id: str, session=None) -> Dict[str, Any]:
+        """Aggregate complexity and docstring coverage over all functions"""
+        records = self._read(
+            session,
+            _Q_COMPLEXITY_STATS,
+            repo_id=repo_id,
+            threshold=HIGH_COMPLEXITY_THRESHOLD,
+        )
 
-        return issues
+        if not records:
+            return _metrics_stats([])
+        record = records[0]
+        return {
+            "total": record["total"] or 0,
+            "avg_complexity": float(record["avg_complexity"] or 0.0),
+            "high_count": record["high_count"] or 0,
+            "documented": record["documented"] or 0,
+        }
 
-    def _detect_circular_deps(self, repo_id: str) -> List[Dict[str, Any]]:
+    def _detect_dead_code(self, repo_id: str, session=None) -> List[DeadCodeIssue]:
+        """Detect dead code (unused functions, etc)"""
+        records = self._read(
+            session, _Q_DEAD_CODE, repo_id=repo_id, exempt_names=DEAD_CODE_EXEMPT_NAMES
+        )
+        return [DeadCodeIssue(*record.values()) for record in records]
+
+    def _count_dead_code(self, repo_id: str, session=None) -> int:
+        """Number of dead-code issues, without fetching them"""
+        records = self._read(
+            session,
+            _Q_DEAD_CODE_COUNT,
+            repo_id=repo_id,
+            exempt_names=DEAD_CODE_EXEMPT_NAMES,
+        )
+        return records[0]["count"] if records else 0
+
+    def _detect_circular_deps(self, repo_id: str, session=None) -> List[Dict[str, Any]]:
         """Detect circular dependencies"""
-        with self.neo4j.driver.session() as session:
-            cycles = self.neo4j.detect_circular_dependencies(repo_id)
-            return [{"cycle": cycle, "length": len(cycle)} for cycle in cycles]
+        cycles = self.neo4j.detect_circular_dependencies(repo_id, session=session)
+        return [{"cycle": cycle, "length": len(cycle)} for cycle in cycles]
 
     def _calculate_quality_score(self, analysis: Dict[str, Any]) -> QualityScore:
         """Calculate overall quality score (0-100)"""
 
-        complexity_metrics = analysis["complexity_metrics"]
-        dead_code = analysis["dead_code"]
+        stats = _analysis_stats(analysis)
+        dead_code_count = _dead_code_count(analysis)
         circular_deps = analysis["circular_dependencies"]
 
         # Complexity score (lower is better, capped at 10)
-        avg_complexity = sum(m.complexity_score for m in complexity_metrics) / max(
-            len(complexity_metrics), 1
-        )
+        avg_complexity = stats["avg_complexity"]
         complexity_score = max(0, 100 - (avg_complexity * 5))  # Higher score is better
 
         # Dead code score (fewer issues = higher score)
-        dead_code_score = max(0, 100 - (len(dead_code) * 5))
+        dead_code_score = max(0, 100 - (dead_code_count * 5))
 
         # Architecture score (fewer circular deps = higher)
         architecture_score = max(0, 100 - (len(circular_deps) * 10))
 
         # Documentation score (functions with docstrings)
-        if complexity_metrics:
-            with_docs = sum(1 for m in complexity_metrics if m.has_docstring)
-            doc_score = (with_docs / len(complexity_metrics)) * 100
+        if stats["total"]:
+            doc_score = (stats["documented"] / stats["total"]) * 100
         else:
             doc_score = 100
 
@@ -208,24 +472,26 @@ class MetricsAnalyzer:
             + doc_score * 0.2
         )
 
+        # dead_code_score and architecture_score are whole numbers already
+        total_score = round(total_score, 1)
         return QualityScore(
-            total_score=round(total_score, 1),
+            total_score=total_score,
             complexity_score=round(complexity_score, 1),
-            dead_code_score=round(dead_code_score, 1),
-            architecture_score=round(architecture_score, 1),
-            maintainability_index=round(total_score, 1),
+            dead_code_score=dead_code_score,
+            architecture_score=architecture_score,
+            maintainability_index=total_score,
         )
 
     def _generate_summary(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Generate human-readable summary"""
 
-        complexity_metrics = analysis["complexity_metrics"]
-        dead_code = analysis["dead_code"]
+        stats = _analysis_stats(analysis)
+        dead_code_count = _dead_code_count(analysis)
         circular_deps = analysis["circular_dependencies"]
         quality = analysis["quality_score"]
 
         # Find worst offenders
-        high_complexity = [m for m in complexity_metrics if m.complexity_score > 8]
+        high_count = stats["high_count"]
 
         # Health assessment
         if quality.total_score >= 80:
@@ -236,27 +502,23 @@ class MetricsAnalyzer:
             health = "critical"
 
         return {
-            "total_functions": len(complexity_metrics),
-            "avg_complexity": round(
-                sum(m.complexity_score for m in complexity_metrics)
-                / max(len(complexity_metrics), 1),
-                1,
-            ),
-            "high_complexity_count": len(high_complexity),
-            "dead_code_count": len(dead_code),
+            "total_functions": stats["total"],
+            "avg_complexity": round(stats["avg_complexity"], 1),
+            "high_complexity_count": high_count,
+            "dead_code_count": dead_code_count,
             "circular_deps_count": len(circular_deps),
             "health": health,
             "quality_score": quality.total_score,
             "top_issues": [
                 {
                     "type": "complexity",
-                    "count": len(high_complexity),
-                    "priority": 2 if len(high_complexity) > 5 else 3,
+                    "count": high_count,
+                    "priority": 2 if high_count > 5 else 3,
                 },
                 {
                     "type": "dead_code",
-                    "count": len(dead_code),
-                    "priority": 1 if len(dead_code) > 0 else 5,
+                    "count": dead_code_count,
+                    "priority": 1 if dead_code_count > 0 else 5,
                 },
                 {
                     "type": "circular_deps",
@@ -269,9 +531,10 @@ class MetricsAnalyzer:
     def export_metrics(self, analysis: Dict[str, Any]) -> Dict[str, Any]:
         """Export metrics in standardized format"""
         return {
-            "complexity_metrics": [asdict(m) for m in analysis["complexity_metrics"]],
-            "dead_code": [asdict(m) for m in analysis["dead_code"]],
+            "complexity_metrics": [_to_dict(m) for m in analysis["complexity_metrics"]],
+            "complexity_stats": _analysis_stats(analysis),
+            "dead_code": [_to_dict(m) for m in analysis["dead_code"]],
             "circular_dependencies": analysis["circular_dependencies"],
-            "quality_score": asdict(analysis["quality_score"]),
+            "quality_score": _to_dict(analysis["quality_score"]),
             "summary": analysis["summary"],
         }
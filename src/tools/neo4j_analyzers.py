@@ -11,8 +11,12 @@ Provides:
 from dataclasses import dataclass, field
 from typing import Set, Dict, List, Optional, Tuple
 from enum import Enum
+import heapq
 import logging
-from collections import defaultdict, deque
+from collections import Counter, defaultdict, deque
+from operator import attrgetter
+
+import numpy as np
 
 from .codebase_analyzer import CodeGraph, CodeNode, CodeEdge, EdgeType, CodeElementType
 
@@ -98,7 +102,6 @@ class RippleEffectAnalyzer:
             logger.warning(f"Function {function_id} not found in graph")
             return RippleEffect(function_id, [], "low", 0, "Function not found")
 
-        affected = set()
         queue = deque([(function_id, 0)])
         visited = {function_id}
 
@@ -106,17 +109,18 @@ class RippleEffectAnalyzer:
         while queue:
             node_id, current_depth = queue.popleft()
 
-            if current_depth > depth:
-                continue
-
             # Find all edges pointing TO this node (incoming calls)
             incoming = self.graph.get_edges_to(node_id, EdgeType.CALLS)
             for edge in incoming:
                 caller_id = edge.source_id
                 if caller_id not in visited:
                     visited.add(caller_id)
-                    affected.add(caller_id)
-                    queue.append((caller_id, current_depth + 1))
+                    # Callers one level past depth are reported, not expanded
+                    if current_depth < depth:
+                        queue.append((caller_id, current_depth + 1))
+
+        visited.discard(function_id)
+        affected = visited
 
         # Determine severity
         severity = self._determine_severity(len(affected), depth)
@@ -145,6 +149,10 @@ class RippleEffectAnalyzer:
 class DependencyChainAnalyzer:
     """Analyzes dependency chains between functions/modules."""
 
+    # Edge types followed, in order, by find_path and by cycle detection
+    PATH_EDGE_TYPES = (EdgeType.CALLS, EdgeType.IMPORTS, EdgeType.DEPENDS_ON)
+    CYCLE_EDGE_TYPES = (EdgeType.CALLS, EdgeType.IMPORTS)
+
     def __init__(self, graph: CodeGraph):
         self.graph = graph
 
@@ -163,14 +171,18 @@ class DependencyChainAnalyzer:
             logger.warning(f"One or both nodes not found")
             return None
 
-        # BFS for shortest path
-        queue = deque([(source_id, [source_id])])
-        visited = {source_id}
+        # BFS for shortest path, remembering each node's predecessor
+        queue = deque([source_id])
+        parents: Dict[str, Optional[str]] = {source_id: None}
 
         while queue:
-            node_id, path = queue.popleft()
+            node_id = queue.popleft()
 
             if node_id == target_id:
+                path = [node_id]
+                while parents[path[-1]] is not None:
+                    path.append(parents[path[-1]])
+                path.reverse()
                 return DependencyChain(
                     source_id=source_id,
                     target_id=target_id,
@@ -179,13 +191,10 @@ class DependencyChainAnalyzer:
                 )
 
             # Follow outgoing edges (calls, imports, depends_on)
-            for edge_type in [EdgeType.CALLS, EdgeType.IMPORTS, EdgeType.DEPENDS_ON]:
-                outgoing = self.graph.get_edges_from(node_id, edge_type)
-                for edge in outgoing:
-                    next_id = edge.target_id
-                    if next_id not in visited:
-                        visited.add(next_id)
-                        queue.append((next_id, path + [next_id]))
+            for next_id in self._successors(node_id, self.PATH_EDGE_TYPES):
+                if next_id not in parents:
+                    parents[next_id] = node_id
+                    queue.append(next_id)
 
         return None
 
@@ -194,62 +203,111 @@ class DependencyChainAnalyzer:
         Detect circular dependency chains.
 
         Returns:
-            List of circular dependency chains
+            List of circular dependency chains, one per strongly connected
+            component (or self-loop), each a shortest cycle through it
         """
         cycles = []
-        visited = set()
 
-        for node_id in self.graph.nodes:
-            if node_id in visited:
+        for component in self._strongly_connected_components():
+            root = component[-1]
+            if len(component) == 1 and root not in self._successors(root):
                 continue
 
-            # DFS to detect cycle
-            path = self._dfs_cycle_detection(node_id, visited)
-            if path:
-                cycles.append(
-                    DependencyChain(
-                        source_id=path[0],
-                        target_id=path[-1],
-                        path=path,
-                        distance=len(path),
-                        has_circular=True,
-                    )
+            path = self._cycle_through(root, set(component))
+            cycles.append(
+                DependencyChain(
+                    source_id=path[0],
+                    target_id=path[-1],
+                    path=path,
+                    distance=len(path),
+                    has_circular=True,
                 )
+            )
 
         return cycles
 
-    def _dfs_cycle_detection(
-        self,
-        node_id: str,
-        visited: Set[str],
-        path: List[str] = None,
-        rec_stack: Set[str] = None,
-    ) -> Optional[List[str]]:
-        """DFS to detect cycles."""
-        if path is None:
-            path = []
-        if rec_stack is None:
-            rec_stack = set()
-
-        visited.add(node_id)
-        rec_stack.add(node_id)
-        path.append(node_id)
-
-        for edge_type in [EdgeType.CALLS, EdgeType.IMPORTS]:
-            outgoing = self.graph.get_edges_from(node_id, edge_type)
-            for edge in outgoing:
-                next_id = edge.target_id
-                if next_id not in visited:
-                    cycle = self._dfs_cycle_detection(
-                        next_id, visited, path.copy(), rec_stack.copy()
-                    )
-                    if cycle:
-                        return cycle
-                elif next_id in rec_stack:
-                    # Found cycle
-                    return path + [next_id]
+    def _successors(
+        self, node_id: str, edge_types: Tuple[EdgeType, ...] = CYCLE_EDGE_TYPES
+    ) -> List[str]:
+        """Targets of node_id's outgoing edges of edge_types, grouped by type."""
+        edges = self.graph.get_edges_from(node_id)
+        return [
+            edge.target_id
+            for edge_type in edge_types
+            for edge in edges
+            if edge.edge_type == edge_type
+        ]
 
-        return None
+    def _strongly_connected_components(self) -> List[List[str]]:
+        """
+        Tarjan's algorithm with an explicit work stack (no recursion limit).
+        Each component lists its root last.
+        """
+        index: Dict[str, int] = {}
+        lowlink: Dict[str, int] = {}
+        stack: List[str] = []
+        on_stack: Set[str] = set()
+        components = []
+
+        for start in self.graph.nodes:
+            if start in index:
+                continue
+
+            index[start] = lowlink[start] = len(index)
+            stack.append(start)
+            on_stack.add(start)
+            work = [(start, iter(self._successors(start)))]
+
+            while work:
+                node_id, successors = work[-1]
+                for next_id in successors:
+                    if next_id not in index:
+                        # Descend; resume node_id's successors afterwards
+                        index[next_id] = lowlink[next_id] = len(index)
+                        stack.append(next_id)
+                        on_stack.add(next_id)
+                        work.append((next_id, iter(self._successors(next_id))))
+                        break
+                    if next_id in on_stack:
+                        lowlink[node_id] = min(lowlink[node_id], index[next_id])
+                else:
+                    work.pop()
+                    if work:
+                        parent_id = work[-1][0]
+                        lowlink[parent_id] = min(lowlink[parent_id], lowlink[node_id])
+
+                    if lowlink[node_id] == index[node_id]:
+                        component = []
+                        while True:
+                            member = stack.pop()
+                            on_stack.discard(member)
+                            component.append(member)
+                            if member == node_id:
+                                break
+                        components.append(component)
+
+        return components
+
+    def _cycle_through(self, root: str, members: Set[str]) -> List[str]:
+        """Shortest cycle from root back to itself, staying inside members."""
+        parents: Dict[str, str] = {}
+        queue = deque([root])
+
+        while queue:
+            node_id = queue.popleft()
+            for next_id in self._successors(node_id):
+                if next_id == root:
+                    path = [node_id]
+                    while path[-1] != root:
+                        path.append(parents[path[-1]])
+                    path.reverse()
+                    path.append(root)
+                    return path
+                if next_id in members and next_id not in parents:
+                    parents[next_id] = node_id
+                    queue.append(next_id)
+
+        return [root]
 
 
 class CriticalPathAnalyzer:
@@ -272,14 +330,11 @@ class CriticalPathAnalyzer:
         scores = self._calculate_importance_scores()
 
         # Get functions only (not files, classes, etc.)
-        function_nodes = [
-            node_id
-            for node_id in self.graph.nodes
-            if self.graph.nodes[node_id].element_type == CodeElementType.FUNCTION
-        ]
+        function_nodes = self.graph.get_nodes_by_type(CodeElementType.FUNCTION)
 
         critical_paths = []
-        for node_id in function_nodes:
+        for node in function_nodes:
+            node_id = node.id
             score = scores.get(node_id, 0.0)
             call_count = len(self.graph.get_edges_to(node_id, EdgeType.CALLS))
 
@@ -302,30 +357,37 @@ class CriticalPathAnalyzer:
 
     def _calculate_importance_scores(self) -> Dict[str, float]:
         """Calculate importance score for each node using iterative algorithm."""
-        scores = defaultdict(float)
+        node_ids = list(self.graph.nodes)
+        if not node_ids:
+            return {}
+        position = {node_id: i for i, node_id in enumerate(node_ids)}
+
+        # Caller / callee positions of every call between known nodes
+        calls = [
+            (position[e.source_id], position[e.target_id])
+            for e in self.graph.edges
+            if e.edge_type == EdgeType.CALLS
+            and e.source_id in position
+            and e.target_id in position
+        ]
+        callers = np.array([c[0] for c in calls], dtype=np.intp)
+        callees = np.array([c[1] for c in calls], dtype=np.intp)
 
         # Initialize all nodes with 1.0
-        for node_id in self.graph.nodes:
-            scores[node_id] = 1.0
+        scores = np.ones(len(node_ids))
 
         # Iterate to calculate scores
         for _ in range(5):  # 5 iterations of refinement
-            new_scores = defaultdict(float)
-            for node_id in self.graph.nodes:
-                # Score increases based on incoming calls
-                incoming = self.graph.get_edges_to(node_id, EdgeType.CALLS)
-                new_scores[node_id] = 1.0 + sum(
-                    scores[e.source_id] / 2 for e in incoming
-                )
-
-            scores = new_scores
+            # Score increases based on incoming calls: half of each caller's
+            # score, summed per callee in one sparse scatter-add
+            scores = 1.0 + np.bincount(
+                callees, weights=scores[callers] / 2, minlength=len(node_ids)
+            )
 
         # Normalize to 0-1 range
-        max_score = max(scores.values()) if scores else 1.0
-        if max_score > 0:
-            scores = {k: v / max_score for k, v in scores.items()}
+        scores /= scores.max()
 
-        return scores
+        return dict(zip(node_ids, scores.tolist()))
 
     def _get_suggestion(self, node_id: str, score: float, call_count: int) -> str:
         """Generate suggestion for critical function."""
@@ -344,6 +406,8 @@ class CodeSmellDetector:
 
     def __init__(self, graph: CodeGraph):
         self.graph = graph
+        # Functions above the report's complexity cut, from the last scan
+        self.complex_functions: List[CodeNode] = []
 
     def detect_all_smells(self) -> List[IssueNode]:
         """
@@ -352,45 +416,56 @@ class CodeSmellDetector:
         Returns:
             List of detected issues
         """
-        issues = []
-        issues.extend(self._detect_god_classes())
-        issues.extend(self._detect_circular_dependencies())
-        issues.extend(self._detect_dead_code())
-        issues.extend(self._detect_high_complexity())
-        issues.extend(self._detect_tight_coupling())
+        issues = self._detect_node_smells()
+        issues[IssueType.CIRCULAR_DEPENDENCY] = self._detect_circular_dependencies()
 
-        return issues
+        # Grouped by type, in IssueType order
+        return [issue for issue_type in IssueType for issue in issues[issue_type]]
 
-    def _detect_god_classes(self) -> List[IssueNode]:
-        """Detect classes with too many responsibilities."""
-        issues = []
+    def _detect_node_smells(self) -> Dict[IssueType, List[IssueNode]]:
+        """Run every per-node check in a single pass over the nodes."""
+        issues = {issue_type: [] for issue_type in IssueType}
+        self.complex_functions = []
 
         for node_id, node in self.graph.nodes.items():
-            if node.element_type != CodeElementType.CLASS:
+            if node.element_type == CodeElementType.FUNCTION:
+                if node.complexity > 5:  # Candidates for the report's top list
+                    self.complex_functions.append(node)
+                checks = (self._check_dead_code, self._check_high_complexity)
+            elif node.element_type == CodeElementType.CLASS:
+                checks = (self._check_god_class, self._check_tight_coupling)
+            elif node.element_type == CodeElementType.MODULE:
+                checks = (self._check_tight_coupling,)
+            else:
                 continue
 
-            # Count methods in class
-            contained_methods = len(
-                self.graph.get_edges_from(node_id, EdgeType.CONTAINS)
-            )
-
-            if contained_methods > 15:  # Threshold
-                issue = IssueNode(
-                    id=f"issue:god_class:{node_id}",
-                    name=f"God Class: {node.name}",
-                    element_type=CodeElementType.CLASS,
-                    file_path=node.file_path,
-                    line_number=node.line_number,
-                    issue_type=IssueType.GOD_CLASS,
-                    severity="warning",
-                    description=f"Class {node.name} has {contained_methods} methods. Consider breaking into smaller classes.",
-                    suggested_fix="Apply Single Responsibility Principle (SRP). Split into multiple focused classes.",
-                    affected_nodes=[node_id],
-                )
-                issues.append(issue)
+            for check in checks:
+                issue = check(node_id, node)
+                if issue is not None:
+                    issues[issue.issue_type].append(issue)
 
         return issues
 
+    def _check_god_class(self, node_id: str, node: CodeNode) -> Optional[IssueNode]:
+        """Flag a class with too many responsibilities."""
+        # Count methods in class
+        contained_methods = len(self.graph.get_edges_from(node_id, EdgeType.CONTAINS))
+
+        if contained_methods > 15:  # Threshold
+            return IssueNode(
+                id=f"issue:god_class:{node_id}",
+                name=f"God Class: {node.name}",
+                element_type=CodeElementType.CLASS,
+                file_path=node.file_path,
+                line_number=node.line_number,
+                issue_type=IssueType.GOD_CLASS,
+                severity="warning",
+                description=f"Class {node.name} has {contained_methods} methods. Consider breaking into smaller classes.",
+                suggested_fix="Apply Single Responsibility Principle (SRP). Split into multiple focused classes.",
+                affected_nodes=[node_id],
+            )
+        return None
+
     def _detect_circular_dependencies(self) -> List[IssueNode]:
         """Detect circular dependency chains."""
         issues = []
@@ -414,86 +489,66 @@ class CodeSmellDetector:
 
         return issues
 
-    def _detect_dead_code(self) -> List[IssueNode]:
-        """Detect unreachable or unused functions."""
-        issues = []
-
-        for node_id, node in self.graph.nodes.items():
-            if node.element_type != CodeElementType.FUNCTION:
-                continue
-
-            # Check if function has no incoming calls
-            incoming_calls = self.graph.get_edges_to(node_id, EdgeType.CALLS)
-
-            if not incoming_calls and node.is_public:  # Public but unused
-                issue = IssueNode(
-                    id=f"issue:dead_code:{node_id}",
-                    name=f"Dead Code: {node.name}",
-                    element_type=CodeElementType.FUNCTION,
-                    file_path=node.file_path,
-                    line_number=node.line_number,
-                    issue_type=IssueType.DEAD_CODE,
-                    severity="info",
-                    description=f"Function {node.name} is not called anywhere.",
-                    suggested_fix="Remove unused function or verify it's meant to be called externally.",
-                    affected_nodes=[node_id],
-                )
-                issues.append(issue)
-
-        return issues
-
-    def _detect_high_complexity(self) -> List[IssueNode]:
-        """Detect functions with high cyclomatic complexity."""
-        issues = []
-
-        for node_id, node in self.graph.nodes.items():
-            if node.element_type != CodeElementType.FUNCTION:
-                continue
-
-            if node.complexity > 10:  # High complexity threshold
-                issue = IssueNode(
-                    id=f"issue:complexity:{node_id}",
-                    name=f"High Complexity: {node.name}",
-                    element_type=CodeElementType.FUNCTION,
-                    file_path=node.file_path,
-                    line_number=node.line_number,
-                    issue_type=IssueType.HIGH_COMPLEXITY,
-                    severity="warning",
-                    description=f"Function {node.name} has complexity score {node.complexity}.",
-                    suggested_fix="Break function into smaller, more focused functions. Consider extracting logic into helper methods.",
-                    affected_nodes=[node_id],
-                )
-                issues.append(issue)
-
-        return issues
-
-    def _detect_tight_coupling(self) -> List[IssueNode]:
-        """Detect tightly coupled modules/classes."""
-        issues = []
-
-        for node_id, node in self.graph.nodes.items():
-            if node.element_type not in [CodeElementType.CLASS, CodeElementType.MODULE]:
-                continue
-
-            # Count outgoing dependencies
-            dependencies = len(self.graph.get_edges_from(node_id, EdgeType.DEPENDS_ON))
-            dependencies += len(self.graph.get_edges_from(node_id, EdgeType.IMPORTS))
+    def _check_dead_code(self, node_id: str, node: CodeNode) -> Optional[IssueNode]:
+        """Flag an unreachable or unused function."""
+        # Check if function has no incoming calls
+        incoming_calls = self.graph.get_edges_to(node_id, EdgeType.CALLS)
+
+        if not incoming_calls and node.is_public:  # Public but unused
+            return IssueNode(
+                id=f"issue:dead_code:{node_id}",
+                name=f"Dead Code: {node.name}",
+                element_type=CodeElementType.FUNCTION,
+                file_path=node.file_path,
+                line_number=node.line_number,
+                issue_type=IssueType.DEAD_CODE,
+                severity="info",
+                description=f"Function {node.name} is not called anywhere.",
+                suggested_fix="Remove unused function or verify it's meant to be called externally.",
+                affected_nodes=[node_id],
+            )
+        return None
 
-            if dependencies > 10:  # High coupling threshold
-                issue = IssueNode(
-                    id=f"issue:coupling:{node_id}",
-                    name=f"Tight Coupling: {node.name}",
-                    element_type=node.element_type,
-                    file_path=node.file_path,
-                    issue_type=IssueType.TIGHT_COUPLING,
-                    severity="warning",
-                    description=f"{node.element_type.value} {node.name} depends on {dependencies} other modules.",
-                    suggested_fix="Reduce dependencies using dependency injection or interface segregation.",
-                    affected_nodes=[node_id],
-                )
-                issues.append(issue)
+    def _check_high_complexity(
+        self, node_id: str, node: CodeNode
+    ) -> Optional[IssueNode]:
+        """Flag a function with high cyclomatic complexity."""
+        if node.complexity > 10:  # High complexity threshold
+            return IssueNode(
+                id=f"issue:complexity:{node_id}",
+                name=f"High Complexity: {node.name}",
+                element_type=CodeElementType.FUNCTION,
+                file_path=node.file_path,
+                line_number=node.line_number,
+                issue_type=IssueType.HIGH_COMPLEXITY,
+                severity="warning",
+                description=f"Function {node.name} has complexity score {node.complexity}.",
+                suggested_fix="Break function into smaller, more focused functions. Consider extracting logic into helper methods.",
+                affected_nodes=[node_id],
+            )
+        return None
 
-        return issues
+    def _check_tight_coupling(
+        self, node_id: str, node: CodeNode
+    ) -> Optional[IssueNode]:
+        """Flag a tightly coupled module/class."""
+        # Count outgoing dependencies
+        dependencies = len(self.graph.get_edges_from(node_id, EdgeType.DEPENDS_ON))
+        dependencies += len(self.graph.get_edges_from(node_id, EdgeType.IMPORTS))
+
+        if dependencies > 10:  # High coupling threshold
+            return IssueNode(
+                id=f"issue:coupling:{node_id}",
+                name=f"Tight Coupling: {node.name}",
+                element_type=node.element_type,
+                file_path=node.file_path,
+                issue_type=IssueType.TIGHT_COUPLING,
+                severity="warning",
+                description=f"{node.element_type.value} {node.name} depends on {dependencies} other modules.",
+                suggested_fix="Reduce dependencies using dependency injection or interface segregation.",
+                affected_nodes=[node_id],
+            )
+        return None
 
 
 from .impact_analyzer import ImpactAnalyzer
@@ -516,6 +571,50 @@ class CodeIntelligenceProvider:
         # if this class is used offline with just CodeGraph, we might not have the DB.
         # But for 'insights', the analyzer usually has a neo4j connection.
 
+        # Memoized analyses, valid while the graph keeps _graph_size
+        self._graph_size: Tuple[int, int] = (0, 0)
+        self._issues: Optional[List[IssueNode]] = None
+        self._issues_by_node: Dict[str, List[IssueNode]] = {}
+        self._complex_functions: List[CodeNode] = []
+        self._criticality: Dict[int, List[CriticalPath]] = {}
+
+    def invalidate(self) -> None:
+        """Drop memoized analyses (call after mutating the CodeGraph)."""
+        self._issues = None
+        self._issues_by_node = {}
+        self._complex_functions = []
+        self._criticality = {}
+
+    def _check_graph(self) -> None:
+        """Invalidate automatically when nodes or edges were added."""
+        size = (len(self.graph.nodes), len(self.graph.edges))
+        if size != self._graph_size:
+            self._graph_size = size
+            self.invalidate()
+
+    def _ensure_issues(self) -> List[IssueNode]:
+        """All code smells, detected once and indexed by affected node."""
+        self._check_graph()
+        if self._issues is None:
+            self._issues = self.smell_detector.detect_all_smells()
+            self._complex_functions = self.smell_detector.complex_functions
+            by_node = defaultdict(list)
+            for issue in self._issues:
+                # A cycle path repeats its first node; list the issue once
+                for node_id in dict.fromkeys(issue.affected_nodes):
+                    by_node[node_id].append(issue)
+            self._issues_by_node = dict(by_node)
+        return self._issues
+
+    def _critical_functions(self, top_n: int) -> List[CriticalPath]:
+        """analyze_criticality(top_n), memoized per top_n."""
+        self._check_graph()
+        if top_n not in self._criticality:
+            self._criticality[top_n] = self.critical_analyzer.analyze_criticality(
+                top_n=top_n
+            )
+        return self._criticality[top_n]
+
     def get_task_context(self, function_id: str) -> Dict:
         """
         Get comprehensive context for working on a specific function.
@@ -535,14 +634,12 @@ class CodeIntelligenceProvider:
         ripple = self.ripple_analyzer.analyze(function_id)
 
         # Find critical dependencies
-        critical_funcs = self.critical_analyzer.analyze_criticality(top_n=5)
+        critical_funcs = self._critical_functions(top_n=5)
         critical_ids = {cp.function_id for cp in critical_funcs}
 
-        # Get all issues
-        all_issues = self.smell_detector.detect_all_smells()
-        related_issues = [
-            issue for issue in all_issues if function_id in issue.affected_nodes
-        ]
+        # Get the issues touching this function
+        self._ensure_issues()
+        related_issues = self._issues_by_node.get(function_id, [])
 
         return {
             "function_id": function_id,
@@ -576,24 +673,20 @@ class CodeIntelligenceProvider:
         Returns:
             Dictionary with quality metrics
         """
-        issues = self.smell_detector.detect_all_smells()
-        critical_funcs = self.critical_analyzer.analyze_criticality(top_n=10)
-
-        # New: Collect top complexity functions
-        top_complexity = []
-        for node_id, node in self.graph.nodes.items():
-            if node.element_type == CodeElementType.FUNCTION:
-                if hasattr(node, "complexity") and node.complexity > 5:
-                    top_complexity.append(
-                        {
-                            "function_name": node.name,
-                            "file_path": node.file_path,
-                            "complexity": node.complexity,
-                        }
-                    )
-        top_complexity = sorted(
-            top_complexity, key=lambda x: x["complexity"], reverse=True
-        )[:10]
+        issues = self._ensure_issues()
+        critical_funcs = self._critical_functions(top_n=10)
+
+        # New: Collect top complexity functions (gathered by the smell scan)
+        top_complexity = [
+            {
+                "function_name": node.name,
+                "file_path": node.file_path,
+                "complexity": node.complexity,
+            }
+            for node in heapq.nlargest(
+                10, self._complex_functions, key=attrgetter("complexity")
+            )
+        ]
 
         # New: Collect coupling data (Requires ImpactAnalyzer with live driver, but we are using CodeGraph here)
         # Limitation: ImpactAnalyzer needs Neo4j Driver, CodeGraph is in-memory representation.
@@ -602,11 +695,13 @@ class CodeIntelligenceProvider:
         # TBD: Implement graph-based coupling if DB unavailable
         # Or better: DependencyChainAnalyzer already tracks dependencies
 
+        issues_by_type, issues_by_severity = self._tally_issues(issues)
+
         return {
             "graph_stats": self.graph.get_stats(),
             "total_issues": len(issues),
-            "issues_by_type": self._count_issues_by_type(issues),
-            "issues_by_severity": self._count_issues_by_severity(issues),
+            "issues_by_type": issues_by_type,
+            "issues_by_severity": issues_by_severity,
             "critical_functions": [
                 {
                     "id": cp.function_id,
@@ -618,48 +713,47 @@ class CodeIntelligenceProvider:
             ],
             "top_complexity": top_complexity,
             "coupling": coupling,
-            "recommendations": self._generate_recommendations(issues),
+            "recommendations": self._generate_recommendations(
+                issues_by_type, issues_by_severity
+            ),
         }
 
-    def _count_issues_by_type(self, issues: List[IssueNode]) -> Dict[str, int]:
-        """Count issues by type."""
-        counts = defaultdict(int)
-        for issue in issues:
-            counts[issue.issue_type.value] += 1
-        return dict(counts)
-
-    def _count_issues_by_severity(self, issues: List[IssueNode]) -> Dict[str, int]:
-        """Count issues by severity."""
-        counts = defaultdict(int)
+    def _tally_issues(
+        self, issues: List[IssueNode]
+    ) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """Count issues by type and by severity in one pass."""
+        by_type = Counter()
+        by_severity = Counter()
         for issue in issues:
-            counts[issue.severity] += 1
-        return dict(counts)
-
-    def _generate_recommendations(self, issues: List[IssueNode]) -> List[str]:
-        """Generate prioritized recommendations based on issues."""
+            by_type[issue.issue_type.value] += 1
+            by_severity[issue.severity] += 1
+        return dict(by_type), dict(by_severity)
+
+    def _generate_recommendations(
+        self, issues_by_type: Dict[str, int], issues_by_severity: Dict[str, int]
+    ) -> List[str]:
+        """Generate prioritized recommendations based on issue counts."""
         recommendations = []
 
-        critical_count = len([i for i in issues if i.severity == "critical"])
+        critical_count = issues_by_severity.get("critical", 0)
         if critical_count > 0:
             recommendations.append(
                 f"🚨 Fix {critical_count} critical issues immediately (circular dependencies)."
             )
 
-        god_classes = len([i for i in issues if i.issue_type == IssueType.GOD_CLASS])
+        god_classes = issues_by_type.get(IssueType.GOD_CLASS.value, 0)
         if god_classes > 0:
             recommendations.append(
                 f"📦 Refactor {god_classes} god classes to improve maintainability."
             )
 
-        dead_code = len([i for i in issues if i.issue_type == IssueType.DEAD_CODE])
+        dead_code = issues_by_type.get(IssueType.DEAD_CODE.value, 0)
         if dead_code > 0:
             recommendations.append(
                 f"🗑️  Remove {dead_code} unused functions to reduce clutter."
             )
 
-        high_complexity = len(
-            [i for i in issues if i.issue_type == IssueType.HIGH_COMPLEXITY]
-        )
+        high_complexity = issues_by_type.get(IssueType.HIGH_COMPLEXITY.value, 0)
         if high_complexity > 0:
             recommendations.append(
                 f"⚡ Simplify {high_complexity} high-complexity functions."
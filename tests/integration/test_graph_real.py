@@ -1,18 +1,26 @@
 import pytest
 import os
 import shutil
+from datetime import datetime
+from enum import Enum
+from uuid import UUID
 from src.tools.graph.networkx_adapter import NetworkXAdapter
 
 
+class Color(str, Enum):
+    RED = "red"
+
+
 class TestGraphReal:
     def setup_method(self):
         self.db_path = "/tmp/test_context_graph.pkl"
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        self.journal_path = "/tmp/test_context_graph.log"
+        self.teardown_method()
 
     def teardown_method(self):
-        if os.path.exists(self.db_path):
-            os.remove(self.db_path)
+        for path in (self.db_path, self.journal_path):
+            if os.path.exists(path):
+                os.remove(path)
 
     def test_local_call_linking(self):
         # Test linking within same file
@@ -56,3 +64,165 @@ class TestGraphReal:
 
         assert "Imports: utils, math" in context
         assert "Defines: main" in context
+
+    def test_name_index_survives_reload_and_delete(self):
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.store_file_node("a.py", "test_repo", "python", 10)
+        adapter.store_code_structure("a.py", "test_repo", {"functions": ["helper"]})
+
+        reloaded = NetworkXAdapter(self.db_path)
+        found = reloaded.find_nodes_by_name("helper")
+        assert [n["id"] for n in found] == ["test_repo:a.py::helper"]
+        assert len(reloaded.find_nodes(label="File")) == 1
+
+        reloaded.delete_node("test_repo:a.py::helper")
+        assert reloaded.find_nodes_by_name("helper") == []
+
+    def test_index_lookups_keep_insertion_order(self):
+        adapter = NetworkXAdapter(self.db_path)
+        ids = [f"{i}:dup" for i in (7, 3, 9, 1, 5, 0, 8, 2, 6, 4)]
+        for node_id in ids:
+            adapter.add_node(node_id, labels=["Function"], name="dup", file="a.py")
+        adapter.add_node("other", labels=["Function"], name="other", file="a.py")
+
+        assert [n["id"] for n in adapter.find_nodes_by_name("dup")] == ids
+        found = adapter.find_nodes(label="Function", name="dup", file="a.py")
+        assert [n["id"] for n in found] == ids
+        adapter.save()
+
+        reloaded = NetworkXAdapter(self.db_path)
+        assert [n["id"] for n in reloaded.find_nodes_by_name("dup")] == ids
+        assert [n["id"] for n in reloaded.find_nodes(label="Function")] == [
+            *ids,
+            "other",
+        ]
+
+    def test_set_indexes_from_old_snapshots_are_rebuilt(self):
+        import networkx as nx
+        import pickle
+
+        graph = nx.DiGraph()
+        graph.add_node("b", name="x", labels=["Function"])
+        graph.add_node("a", name="x", labels=["Function"])
+        with open(self.db_path, "wb") as f:
+            pickle.dump((graph, {"x": {"a", "b"}}, {"Function": {"a", "b"}}), f)
+
+        adapter = NetworkXAdapter(self.db_path)
+        assert [n["id"] for n in adapter.find_nodes_by_name("x")] == ["b", "a"]
+        adapter.delete_node("b")
+        assert [n["id"] for n in adapter.find_nodes(label="Function")] == ["a"]
+
+    def test_journal_replayed_then_compacted(self):
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.store_file_node("b.py", "test_repo", "python", 5)
+        adapter.store_code_structure(
+            "b.py", "test_repo", {"functions": ["run"], "imports": ["os"]}
+        )
+        assert not os.path.exists(self.db_path)
+        assert os.path.exists(self.journal_path)
+
+        replayed = NetworkXAdapter(self.db_path)
+        assert replayed.get_node("test_repo:b.py")["imports"] == ["os"]
+        assert replayed.find_nodes_by_name("run")
+
+        replayed.close()
+        assert os.path.exists(self.db_path)
+        assert not os.path.exists(self.journal_path)
+        assert NetworkXAdapter(self.db_path).find_nodes_by_name("run")
+
+    def test_journal_checkpoints_into_snapshot(self, monkeypatch):
+        import src.tools.graph.networkx_adapter as adapter_module
+
+        monkeypatch.setattr(adapter_module, "_CHECKPOINT_MIN_BYTES", 256)
+        adapter = NetworkXAdapter(self.db_path)
+        for i in range(20):
+            adapter.add_node(f"n{i}", labels=["Function"], name=f"f{i}")
+
+        assert os.path.exists(self.db_path)
+        assert len(NetworkXAdapter(self.db_path).find_nodes(label="Function")) == 20
+
+    def test_journal_replay_keeps_non_json_values(self):
+        values = {
+            "when": datetime(2024, 5, 1, 12, 30),
+            "uid": UUID("12345678-1234-5678-1234-567812345678"),
+            "span": (1, 2),
+            "color": Color.RED,
+            "meta": {"k": (3, 4)},
+        }
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.add_node("n", labels=["Function"], **values)
+        adapter.add_nodes([("m", ["Function"], {"span": (5, 6)})])
+        assert not os.path.exists(self.db_path)
+
+        replayed = NetworkXAdapter(self.db_path)
+        node = replayed.get_node("n")
+        for key, value in values.items():
+            assert node[key] == value
+            assert type(node[key]) is type(value)
+        assert type(replayed.get_node("m")["span"]) is tuple
+
+    def test_snapshot_keeps_tuple_ids_and_values(self):
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.add_node(("repo", "a.py"), labels=["File"], span=(1, 2))
+        adapter.add_node("b", labels=["File"], meta={"k": (3, 4)})
+        adapter.add_relationship(("repo", "a.py"), "b", "IMPORTS", at=(7,))
+        adapter.close()
+        with open(self.db_path, "rb") as f:
+            assert f.read(8) == b"YVGRAPH1"
+
+        reloaded = NetworkXAdapter(self.db_path)
+        assert reloaded.get_node(("repo", "a.py"))["span"] == (1, 2)
+        assert reloaded.get_node("b")["meta"] == {"k": (3, 4)}
+        assert type(reloaded.get_node("b")["meta"]["k"]) is tuple
+        assert reloaded.get_neighbors(("repo", "a.py")) == ["b"]
+        assert reloaded.graph.edges[("repo", "a.py"), "b"]["at"] == (7,)
+
+    def test_context_cache_invalidated_by_mutation(self):
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.store_file_node("c.py", "test_repo", "python", 5)
+        adapter.store_code_structure("c.py", "test_repo", {"functions": ["one"]})
+        assert "Defines: one" in adapter.get_context_for_file("c.py", "test_repo")
+
+        adapter.store_code_structure("c.py", "test_repo", {"imports": ["json"]})
+        context = adapter.get_context_for_file("c.py", "test_repo")
+        assert "Imports: json" in context
+        assert "Defines: one" in context
+
+    def test_count_edges_by_type(self):
+        adapter = NetworkXAdapter(self.db_path)
+        assert adapter.count_edges_by_type() == {}
+
+        adapter.add_relationship("a", "b", "CALLS")
+        adapter.add_relationship("b", "c", "CALLS")
+        adapter.add_relationship("f", "a", "CONTAINS")
+        assert adapter.count_edges_by_type() == {"CALLS": 2, "CONTAINS": 1}
+
+        adapter.graph.remove_edge("a", "b")
+        assert adapter.count_edges_by_type() == {"CALLS": 1, "CONTAINS": 1}
+
+    def test_get_neighbors_directions(self):
+        adapter = NetworkXAdapter(self.db_path)
+        adapter.add_relationship("a", "b", "CALLS")
+        adapter.add_relationship("c", "a", "CALLS")
+
+        assert adapter.get_neighbors("a") == ["b"]
+        assert adapter.get_neighbors("a", "in") == ["c"]
+        assert adapter.get_neighbors("a", "both") == ["c", "b"]
+        assert adapter.get_neighbors("missing") == []
+        with pytest.raises(ValueError):
+            adapter.get_neighbors("a", "sideways")
+
+    def test_get_hubs_ranks_repo_nodes_by_degree(self):
+        adapter = NetworkXAdapter(self.db_path)
+        repo = "test_repo"
+        adapter.store_file_node("core.py", repo, "python", 10)
+        adapter.store_file_node("leaf.py", repo, "python", 5)
+        adapter.store_file_node("other.py", "other_repo", "python", 5)
+        adapter.store_code_structure("core.py", repo, {"functions": ["a", "b"]})
+
+        hubs = adapter.get_hubs(repo, limit=1)
+
+        assert hubs == [
+            {"file": "core.py", "symbol": None, "type": "File", "degree": 2}
+        ]
+        assert adapter.get_hubs("missing_repo") == []
@@ -71,3 +71,33 @@ def test_unsupported_extension(parser, tmp_path):
     f.write_text("some content", encoding="utf-8")
     result = parser.parse_file(str(f))
     assert "error" in result
+
+
+def test_python_parse_cache_reused_across_parsers(tmp_path):
+    cache_dir = tmp_path / "ast_cache"
+    src = tmp_path / "mod.py"
+    src.write_text("def a():\n    b()\n", encoding="utf-8")
+    first = CodeParser(cache_dir=str(cache_dir)).parse_file(str(src))
+
+    assert list(cache_dir.rglob("*.json"))
+
+    # Same content under a different name hits the cache but keeps its own name
+    copy = tmp_path / "copy.py"
+    copy.write_text(src.read_text(encoding="utf-8"), encoding="utf-8")
+    second = CodeParser(cache_dir=str(cache_dir)).parse_file(str(copy))
+
+    assert second["file"] == "copy.py"
+    assert second["functions"] == first["functions"] == ["a"]
+    assert second["calls"] == [{"caller": "a", "callee": "b"}]
+
+
+def test_parse_cache_defaults_to_yaver_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("HOME", str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    src = tmp_path / "mod.py"
+    src.write_text("def a():\n    pass\n", encoding="utf-8")
+
+    CodeParser().parse_file(str(src))
+
+    assert list((tmp_path / ".yaver" / "cache" / "parser").rglob("*.json"))
+    assert not (tmp_path / "cache").exists()
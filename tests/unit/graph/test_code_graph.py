@@ -0,0 +1,62 @@
+from pathlib import Path
+
+from tools.codebase_analyzer import (
+    CodeEdge,
+    CodeElementType,
+    CodeGraph,
+    CodeNode,
+    EdgeType,
+)
+
+
+def _graph():
+    graph = CodeGraph("demo", Path("."))
+    for name in ("a", "b", "c"):
+        graph.add_node(CodeNode(name, name, CodeElementType.FUNCTION))
+    graph.add_edge(CodeEdge("a", "b", EdgeType.CALLS))
+    graph.add_edge(CodeEdge("a", "c", EdgeType.CALLS))
+    graph.add_edge(CodeEdge("a", "c", EdgeType.READS))
+    graph.add_edge(CodeEdge("b", "c", EdgeType.CALLS))
+    return graph
+
+
+def test_edge_lookups_by_direction_and_type():
+    graph = _graph()
+
+    assert [e.target_id for e in graph.get_edges_from("a")] == ["b", "c", "c"]
+    assert [e.target_id for e in graph.get_edges_from("a", EdgeType.CALLS)] == [
+        "b",
+        "c",
+    ]
+    assert [e.source_id for e in graph.get_edges_to("c", EdgeType.CALLS)] == [
+        "a",
+        "b",
+    ]
+    assert graph.get_edges_to("a") == []
+    assert graph.get_edges_from("missing", EdgeType.CALLS) == []
+
+
+def test_edge_lookups_return_fresh_lists():
+    graph = _graph()
+
+    graph.get_edges_from("a").clear()
+    graph.get_edges_to("c").append(CodeEdge("x", "c", EdgeType.CALLS))
+
+    assert len(graph.get_edges_from("a")) == 3
+    assert len(graph.get_edges_to("c")) == 3
+
+
+def test_nodes_by_type_follow_replacements():
+    graph = _graph()
+    graph.add_node(CodeNode("K", "K", CodeElementType.CLASS))
+    graph.add_node(CodeNode("b", "b", CodeElementType.CLASS))
+
+    functions = graph.get_nodes_by_type(CodeElementType.FUNCTION)
+    assert [n.id for n in functions] == ["a", "c"]
+    assert [n.id for n in graph.get_nodes_by_type(CodeElementType.CLASS)] == [
+        "K",
+        "b",
+    ]
+    assert graph.get_nodes_by_type(CodeElementType.FILE) == []
+    assert graph.get_stats()["functions"] == 2
+    assert graph.get_stats()["classes"] == 2
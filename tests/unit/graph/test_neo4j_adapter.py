@@ -71,3 +71,15 @@ def test_store_analysis(mock_driver):
     # 4. Function node merge + rel
 
     assert session.run.call_count >= 4
+
+
+def test_bump_repo_version(mock_driver):
+    driver, session = mock_driver
+    adapter = Neo4jAdapter("bolt://localhost:7687", ("neo4j", "pass"))
+
+    adapter.bump_repo_version("my_repo")
+
+    query, params = session.run.call_args.args
+    assert "MERGE (r:Repo {id: $repo_id})" in query
+    assert "graph_version" in query
+    assert params == {"repo_id": "my_repo"}
@@ -0,0 +1,190 @@
+from contextlib import contextmanager
+
+import tools.metrics as metrics
+from tools.metrics import ComplexityMetric, MetricsAnalyzer
+
+
+def _row(i):
+    return {
+        "function_id": f"f{i}",
+        "function_name": f"func{i}",
+        "file_path": "a.py",
+        "complexity_score": float(100 - i),
+        "loc": 3,
+        "parameters": 1,
+        "has_docstring": i % 2 == 0,
+    }
+
+
+class FakeTx:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def run(self, query, params):
+        graph = self.graph
+        graph.queries.append((query, params))
+        if query == metrics._Q_COMPLEXITY:
+            skip, limit = params["skip"], params["top_n"]
+            graph.pages.append((skip, limit))
+            return graph.rows[skip : skip + limit]
+        if query == metrics._Q_REPO_VERSION:
+            return [
+                {
+                    "last_analyzed": graph.version,
+                    "files": 1,
+                    "graph_version": graph.graph_version,
+                }
+            ]
+        if query == metrics._Q_COMPLEXITY_STATS:
+            return [
+                {
+                    "total": len(graph.rows),
+                    "avg_complexity": 1.0,
+                    "high_count": 0,
+                    "documented": len(graph.rows),
+                }
+            ]
+        if query == metrics._Q_DEAD_CODE_COUNT:
+            return [{"count": 0}]
+        return []
+
+
+class FakeSession:
+    def __init__(self, graph):
+        self.graph = graph
+
+    def execute_read(self, fn, *args):
+        return fn(FakeTx(self.graph), *args)
+
+
+class FakeDriver:
+    def __init__(self, graph):
+        self.graph = graph
+
+    @contextmanager
+    def session(self, **kwargs):
+        yield FakeSession(self.graph)
+
+
+class FakeNeo4j:
+    def __init__(self, rows=0):
+        self.rows = [_row(i) for i in range(rows)]
+        self.version = "2024-01-01T00:00:00"
+        self.graph_version = 1
+        self.queries = []
+        self.pages = []
+        self.driver = FakeDriver(self)
+
+    def detect_circular_dependencies(self, repo_id, session=None):
+        return []
+
+
+def test_iter_complexity_advances_skip_and_stops_on_short_page():
+    neo4j = FakeNeo4j(rows=7)
+    analyzer = MetricsAnalyzer(neo4j)
+
+    pages = list(analyzer.iter_complexity("repo", page_size=3))
+
+    assert [len(page) for page in pages] == [3, 3, 1]
+    assert neo4j.pages == [(0, 3), (3, 3), (6, 3)]
+    assert [m.function_id for page in pages for m in page] == [
+        f"f{i}" for i in range(7)
+    ]
+    assert isinstance(pages[0][0], ComplexityMetric)
+
+
+def test_iter_complexity_stops_after_empty_page():
+    neo4j = FakeNeo4j(rows=6)
+    analyzer = MetricsAnalyzer(neo4j)
+
+    pages = list(analyzer.iter_complexity("repo", page_size=3))
+
+    # A full last page needs one more (empty) read to know it was the last
+    assert [len(page) for page in pages] == [3, 3]
+    assert neo4j.pages == [(0, 3), (3, 3), (6, 3)]
+
+
+def test_full_detail_is_top_n_and_all_detail_pages(monkeypatch):
+    monkeypatch.setattr(metrics, "COMPLEXITY_PAGE_SIZE", 4)
+    neo4j = FakeNeo4j(rows=metrics.COMPLEXITY_TOP_N + 5)
+    analyzer = MetricsAnalyzer(neo4j, max_workers=1)
+
+    full = analyzer.analyze_repository("repo", detail="full")
+    assert len(full["complexity_metrics"]) == metrics.COMPLEXITY_TOP_N
+    assert full["complexity_stats"]["total"] == metrics.COMPLEXITY_TOP_N + 5
+
+    neo4j.pages.clear()
+    everything = analyzer.analyze_repository("repo", detail="all")
+    assert len(everything["complexity_metrics"]) == metrics.COMPLEXITY_TOP_N + 5
+    assert all(limit == 4 for _, limit in neo4j.pages)
+
+
+def test_unchanged_repository_is_served_from_cache():
+    neo4j = FakeNeo4j(rows=3)
+    analyzer = MetricsAnalyzer(neo4j, max_workers=1)
+
+    first = analyzer.analyze_repository("repo")
+    neo4j.queries.clear()
+    second = analyzer.analyze_repository("repo")
+
+    assert [q for q, _ in neo4j.queries] == [metrics._Q_REPO_VERSION]
+    assert second == first
+
+    # Callers get copies; editing one doesn't reach the cached analysis
+    second["complexity_metrics"].clear()
+    second["summary"]["health"] = "edited"
+    third = analyzer.analyze_repository("repo")
+    assert len(third["complexity_metrics"]) == 3
+    assert third["summary"] == first["summary"]
+
+
+def test_graph_version_bump_expires_cached_analysis():
+    neo4j = FakeNeo4j(rows=3)
+    analyzer = MetricsAnalyzer(neo4j, max_workers=1)
+    analyzer.analyze_repository("repo")
+
+    # e.g. call linking added CALLS edges without touching any File node
+    neo4j.graph_version += 1
+    neo4j.queries.clear()
+    analyzer.analyze_repository("repo")
+
+    assert metrics._Q_COMPLEXITY in [q for q, _ in neo4j.queries]
+
+
+def test_invalidate_cache_drops_only_that_repository():
+    neo4j = FakeNeo4j(rows=3)
+    analyzer = MetricsAnalyzer(neo4j, max_workers=1)
+    analyzer.analyze_repository("repo")
+    analyzer.analyze_repository("other")
+
+    analyzer.invalidate_cache("repo")
+    neo4j.queries.clear()
+    analyzer.analyze_repository("other")
+    assert [q for q, _ in neo4j.queries] == [metrics._Q_REPO_VERSION]
+
+    neo4j.queries.clear()
+    analyzer.analyze_repository("repo")
+    assert metrics._Q_COMPLEXITY in [q for q, _ in neo4j.queries]
+
+
+def test_concurrent_queries_match_sequential():
+    sequential = MetricsAnalyzer(FakeNeo4j(rows=5), max_workers=1)
+    concurrent = MetricsAnalyzer(FakeNeo4j(rows=5), max_workers=4)
+
+    for detail in ("summary", "full"):
+        assert concurrent.analyze_repository(
+            "repo", detail
+        ) == sequential.analyze_repository("repo", detail)
+
+
+def test_summary_detail_skips_listings():
+    neo4j = FakeNeo4j(rows=5)
+    analysis = MetricsAnalyzer(neo4j, max_workers=1).analyze_repository(
+        "repo", detail="summary"
+    )
+
+    assert analysis["complexity_metrics"] == []
+    assert analysis["dead_code"] == []
+    assert analysis["dead_code_count"] == 0
+    assert analysis["summary"]["total_functions"] == 5
+    assert metrics._Q_COMPLEXITY not in [q for q, _ in neo4j.queries]